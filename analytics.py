@@ -0,0 +1,189 @@
+"""
+Corpus-wide aggregates for the welcome page dashboard.
+
+The full tag distribution, the most common ingredients, a cook-time
+histogram and the rating distribution are computed once with pandas /
+NumPy and kept as running totals. Each recipe's contribution is kept too,
+so when recipes are added, removed or rated only their share of the totals
+is subtracted or added again. Sorted views for the charts are materialized
+lazily and reused until the totals change, so rendering the dashboard does
+not depend on the size of the corpus.
+"""
+import threading
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from facets import parse_minutes
+from ingredients import parse_ingredient
+
+# Cook-time histogram bins (minutes); recipes without a parsable time go in "Unknown"
+MINUTE_BINS = [0, 15, 30, 45, 60, 90, 120]
+MINUTE_LABELS = ["< 15 min", "15-30 min", "30-45 min", "45-60 min", "1-1.5 hr", "1.5-2 hr", "2 hr +", "Unknown"]
+
+
+def recipe_ingredients(recipe):
+    """ Ingredient lines of a full recipe, or of a split-layout summary (its "search" text). """
+    lines = recipe.get("ingredients")
+    if lines is None:
+        lines = recipe.get("search", "").split("\n")
+    return [str(line) for line in lines if str(line).strip()]
+
+
+def ingredient_name(line):
+    """ Canonical ingredient of a line, or None for lines with nothing left (e.g. "1 cup"). """
+    return parse_ingredient(line)[2] or None
+
+
+def minute_bins(values):
+    """ Histogram bin of each ready_in value in minutes; NaN goes to the last ("Unknown") bin. """
+    values = np.asarray(values, dtype=np.float64)
+    bins = np.digitize(values, MINUTE_BINS[1:], right=True)
+    bins[np.isnan(values)] = len(MINUTE_LABELS) - 1
+    return bins
+
+
+class CorpusAnalytics:
+    def __init__(self):
+        self.size = 0
+        self.tags = Counter()                # tag -> recipes with it
+        self.ingredients = Counter()         # canonical ingredient -> recipes using it
+        self.minutes = np.zeros(len(MINUTE_LABELS), dtype=np.int64)
+        self.ratings = np.zeros(6, dtype=np.int64)     # index = stars (0 unused)
+        self.lock = threading.Lock()
+        self._recipes = {}                   # id -> (key, tags, ingredients, minute bin, ratings)
+        self._names = {}                     # ingredient line -> canonical name
+        self._views = {}
+
+    ##### Contributions #####
+    @staticmethod
+    def _key(recipe):
+        # Recipes are only ever changed by being rated
+        return len(recipe.get("ratings") or [])
+
+    def _name(self, line):
+        if line not in self._names:
+            self._names[line] = ingredient_name(line)
+        return self._names[line]
+
+    def _contribution(self, recipe):
+        tags = tuple(sorted({t.strip().lower() for t in recipe.get("tags", [])}))
+        names = tuple(sorted({n for n in map(self._name, recipe_ingredients(recipe)) if n}))
+        minutes = int(minute_bins([parse_minutes(recipe.get("ready_in"))])[0])
+        ratings = tuple(int(r) for r in recipe.get("ratings") or [] if 1 <= int(r) <= 5)
+        return self._key(recipe), tags, names, minutes, ratings
+
+    def _apply(self, contribution, sign):
+        _, tags, names, minutes, ratings = contribution
+        for counter, keys in ((self.tags, tags), (self.ingredients, names)):
+            for key in keys:
+                counter[key] += sign
+                if counter[key] <= 0:
+                    del counter[key]
+        self.minutes[minutes] += sign
+        for r in ratings:
+            self.ratings[r] += sign
+        self.size += sign
+
+    ##### Building and updating #####
+    def build(self, recipes_by_id):
+        """ Compute every aggregate from scratch, vectorised over the whole corpus. """
+        ids = list(recipes_by_id)
+        recipes = list(recipes_by_id.values())
+        frame = pd.DataFrame({
+            "id": ids,
+            "tags": [[t.strip().lower() for t in r.get("tags", [])] for r in recipes],
+            "ingredients": [recipe_ingredients(r) for r in recipes],
+            "ratings": [[int(x) for x in r.get("ratings") or [] if 1 <= int(x) <= 5] for r in recipes],
+        })
+
+        # One (id, tag) / (id, ingredient) row per recipe, so counts are "recipes with ..."
+        tags = frame[["id", "tags"]].explode("tags").dropna().drop_duplicates()
+        lines = frame[["id", "ingredients"]].explode("ingredients").dropna()
+        unique_lines = lines["ingredients"].drop_duplicates()
+        self._names.update(zip(unique_lines, map(ingredient_name, unique_lines)))
+        lines["name"] = lines["ingredients"].map(self._names)
+        names = lines[["id", "name"]].dropna().drop_duplicates()
+
+        minutes = minute_bins(pd.Series([r.get("ready_in") for r in recipes], dtype=object).map(parse_minutes))
+        ratings = np.concatenate([np.asarray(r, dtype=np.int64) for r in frame["ratings"]] + [np.zeros(0, np.int64)])
+
+        self.size = len(ids)
+        self.tags = Counter(tags["tags"].value_counts().to_dict())
+        self.ingredients = Counter(names["name"].value_counts().to_dict())
+        self.minutes = np.bincount(minutes, minlength=len(MINUTE_LABELS)).astype(np.int64)
+        self.ratings = np.bincount(ratings, minlength=6).astype(np.int64)
+
+        # Per-recipe contributions, for incremental updates later
+        tags_by_id = tags.groupby("id")["tags"].agg(lambda s: tuple(sorted(s))).to_dict()
+        names_by_id = names.groupby("id")["name"].agg(lambda s: tuple(sorted(s))).to_dict()
+        self._recipes = {
+            rid: (self._key(r), tags_by_id.get(rid, ()), names_by_id.get(rid, ()), int(m), tuple(rt))
+            for rid, r, m, rt in zip(ids, recipes, minutes, frame["ratings"])
+        }
+        self._views = {}
+
+    def sync(self, recipes_by_id):
+        """
+        Bring the aggregates in line with {id: recipe}: new, removed and
+        re-rated recipes are subtracted/added; everything else is untouched.
+        Falls back to a full rebuild when most of the corpus changed.
+        """
+        with self.lock:
+            changed = [rid for rid, r in recipes_by_id.items() if self._recipes.get(rid, (None,))[0] != self._key(r)]
+            gone = [rid for rid in self._recipes if rid not in recipes_by_id]
+            if not changed and not gone:
+                return
+            if not self._recipes or len(changed) + len(gone) > max(50, len(self._recipes) // 10):
+                self.build(recipes_by_id)
+                return
+            for rid in gone + changed:
+                if rid in self._recipes:
+                    self._apply(self._recipes.pop(rid), -1)
+            for rid in changed:
+                self._recipes[rid] = self._contribution(recipes_by_id[rid])
+                self._apply(self._recipes[rid], 1)
+            self._views = {}
+
+    ##### Views #####
+    def _view(self, name, compute):
+        """ Materialize a view once and reuse it until the totals change. """
+        # sync() may be updating the totals from another session
+        with self.lock:
+            view = self._views.get(name)
+            if view is None:
+                view = self._views[name] = compute()
+            return view
+
+    def tag_counts(self):
+        """ Full tag distribution as a Series, most common first. """
+        return self._view("tags", lambda: pd.Series(
+            dict(self.tags), dtype=np.int64
+        ).sort_values(ascending=False, kind="stable"))
+
+    def top_tags(self, n=10):
+        return self.tag_counts().head(n)
+
+    def top_ingredients(self, n=15):
+        """ The n ingredients used by the most recipes. """
+        return self._view(("ingredients", n), lambda: pd.Series(
+            dict(self.ingredients.most_common(n)), dtype=np.int64
+        ))
+
+    def minutes_histogram(self):
+        return self._view("minutes", lambda: pd.Series(self.minutes, index=MINUTE_LABELS))
+
+    def rating_distribution(self):
+        return self._view("ratings", lambda: pd.Series(self.ratings[1:], index=[1, 2, 3, 4, 5]))
+
+    @property
+    def ratings_count(self):
+        return self._view("ratings_count", lambda: int(self.ratings.sum()))
+
+    @property
+    def average_rating(self):
+        return self._view("average_rating", lambda: (
+            float((self.ratings * np.arange(6)).sum() / self.ratings.sum()) if self.ratings.sum() else None
+        ))
+
@@ -0,0 +1,363 @@
+"""
+Read-only HTTP API over the recipe store, for tools that would otherwise
+scrape the Streamlit UI or pull recipes.json from GitHub wholesale.
+
+A plain ASGI app; serve it with any ASGI server, e.g.
+    uvicorn api:app --port 8000
+
+It reads the same files through the same local-first LocalStore as
+app.py, configured from .streamlit/secrets.toml (same keys) or
+COOKBOOK_<KEY> environment variables such as COOKBOOK_GITHUB_TOKEN. The
+store is read-only and keeps its own cache (`<cache_dir>/api`, or
+`api_cache_dir`), so it never pushes or clobbers the app's queued writes.
+
+Endpoints (all GET):
+    /recipes?limit=&cursor=                       recipe summaries, by id
+    /recipes/search?q=&tag=&match=all|any&limit=&cursor=
+    /recipes/<id>                                 one full recipe
+    /tags                                         {tag: recipe count}
+    /tags/<tag>?limit=&cursor=                    summaries of recipes with a tag
+    /export.jsonl                                 every full recipe, one per line (streamed)
+
+Lists are paged with an opaque cursor (the last id of the page), so pages
+stay consistent while recipes are added or removed. Responses carry an
+ETag for the corpus version they were built from (in the split layout, a
+single recipe's ETag is that of its own file); a request with a matching
+If-None-Match gets an empty 304. Responses are gzipped when the client
+accepts it.
+"""
+import asyncio
+import base64
+import bisect
+import gzip
+import json
+import os
+import threading
+import zlib
+from urllib.parse import parse_qs, unquote
+
+import numpy as np
+
+import recipe_store
+import snapshot
+from facets import FacetIndex
+from github_api import GitHubRepo, git_sha
+from local_store import LocalStore
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+# Smaller bodies are not worth compressing
+GZIP_MIN_BYTES = 1024
+EXPORT_CHUNK = 200
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+##### Settings #####
+def load_settings(path=os.path.join(APP_DIR, ".streamlit", "secrets.toml")):
+    """ The app's Streamlit secrets, overridden by COOKBOOK_<KEY> environment variables. """
+    settings = {}
+    if os.path.exists(path):
+        import tomllib
+        with open(path, "rb") as f:
+            settings = tomllib.load(f)
+    for key, value in os.environ.items():
+        if key.startswith("COOKBOOK_"):
+            settings[key[len("COOKBOOK_"):].lower()] = value
+    return settings
+
+
+def store_from_settings(settings):
+    remote = GitHubRepo(
+        settings["github_repo"], settings["github_token"], settings.get("github_branch", "main"),
+        settings.get("github_api_url", "https://api.github.com"),
+    )
+    # Not the app's cache directory: its outbox and meta.json belong to the app
+    cache_dir = settings.get("api_cache_dir", os.path.join(settings.get("cache_dir", os.path.join(APP_DIR, ".recipe_cache")), "api"))
+    seeds = {"recipes.json": os.path.join(APP_DIR, "recipes.json")}
+    store = LocalStore(remote, cache_dir, seeds, interval=float(settings.get("sync_interval", 30)), read_only=True)
+    if settings.get("recipes_layout", "single") == "split":
+        # Bodies are read unwatched (an export reads them all); listing their directory keeps them current
+        store.watch_dir(settings.get("recipes_dir", "recipes"))
+    return store.start()
+
+
+##### Corpus #####
+class Corpus:
+    """ One version of the recipe list, indexed for paging, search and tags. """
+
+    def __init__(self, recipes, version, split=False):
+        self.version = version
+        self.split = split
+        self.content = None         # the raw file this was built from
+        self.cache = {}             # encoded responses derived from this version
+        ids = [r["id"] for r in recipes] if split else recipe_store.assign_ids(recipes)
+        self.recipes = dict(zip(ids, recipes))
+        # Everything is listed in id order so a cursor (the last id seen) stays valid between versions
+        self.order = np.argsort(np.asarray(ids, dtype=object), kind="stable")
+        self.ids = [ids[i] for i in self.order]
+        self.summaries = [
+            {"id": ids[i], **{field: recipes[i][field] for field in recipe_store.SUMMARY_FIELDS if field in recipes[i]}}
+            for i in self.order
+        ]
+        self.facets = FacetIndex([recipes[i] for i in self.order])
+
+    def page(self, mask, cursor, limit):
+        """ Up to `limit` summaries selected by `mask` after the cursor id, and the next cursor. """
+        start = bisect.bisect_right(self.ids, cursor) if cursor is not None else 0
+        rows = np.flatnonzero(mask[start:])[:limit + 1] + start
+        items = [self.summaries[i] for i in rows[:limit]]
+        next_cursor = encode_cursor(items[-1]["id"]) if len(rows) > limit else None
+        return {"items": items, "next_cursor": next_cursor}
+
+
+def encode_cursor(rid):
+    return base64.urlsafe_b64encode(rid.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def etag_matches(if_none_match, etag):
+    """ If-None-Match may list several tags, weak ones included, or be "*". """
+    if not if_none_match:
+        return False
+    tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+def decode_cursor(cursor):
+    """ Inverse of encode_cursor(); anything it could not have produced (including "") is a 400. """
+    try:
+        rid = base64.b64decode(cursor + "=" * (-len(cursor) % 4), altchars=b"-_", validate=True).decode("utf-8")
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPError(400, "invalid cursor")
+    if not rid or encode_cursor(rid) != cursor:
+        raise HTTPError(400, "invalid cursor")
+    return rid
+
+
+##### API #####
+class RecipeAPI:
+    def __init__(self, store=None, settings=None):
+        """ store: a LocalStore to read from; built from `settings` (or load_settings()) on first use if omitted. """
+        self._store = store
+        self.settings = settings
+        self._corpus = None
+        self._lock = threading.Lock()
+
+    @property
+    def store(self):
+        with self._lock:
+            if self._store is None:
+                self.settings = self.settings or load_settings()
+                self._store = store_from_settings(self.settings)
+            return self._store
+
+    def _setting(self, key, default):
+        return (self.settings or {}).get(key, default)
+
+    @property
+    def split(self):
+        return self._setting("recipes_layout", "single") == "split"
+
+    @property
+    def recipes_path(self):
+        if self.split:
+            return f"{self._setting('recipes_dir', 'recipes')}/{recipe_store.MANIFEST_FILE}"
+        return self._setting("recipes_file_path", "recipes.json")
+
+    def corpus(self):
+        """ The indexed corpus for the store's current recipes file, rebuilt only when its content changes. """
+        content = self.store.read(self.recipes_path)
+        if content is None:
+            raise HTTPError(503, "recipes are not available")
+        corpus = self._corpus
+        if corpus is not None and corpus.content is content:
+            return corpus
+        version = git_sha(content)
+        if corpus is None or corpus.version != version:
+            if self.recipes_path.endswith(snapshot.SUFFIX):
+                recipes = list(snapshot.SnapshotReader(content))
+            else:
+                recipes = json.loads(content.decode("utf-8"))
+            corpus = Corpus(recipes, version, self.split)
+        corpus.content = content
+        self._corpus = corpus
+        return corpus
+
+    def recipe(self, corpus, rid):
+        """ (full recipe, version) for an id. In the split layout the body file has its own version. """
+        if rid not in corpus.recipes:
+            raise HTTPError(404, f"no recipe with id {rid!r}")
+        if not corpus.split:
+            return dict(corpus.recipes[rid], id=rid), corpus.version
+        content = self.store.read(recipe_store.body_path(rid, self._setting("recipes_dir", "recipes")), watch=False)
+        if content is None:
+            raise HTTPError(404, f"no recipe with id {rid!r}")
+        return json.loads(content.decode("utf-8")), git_sha(content)
+
+    def export(self, corpus):
+        """ Every full recipe as JSON lines, in id order, a chunk at a time. """
+        root = self._setting("recipes_dir", "recipes")
+        for start in range(0, len(corpus.ids), EXPORT_CHUNK):
+            ids = corpus.ids[start:start + EXPORT_CHUNK]
+            if corpus.split:
+                bodies = self.store.read_many([recipe_store.body_path(rid, root) for rid in ids], watch=False)
+                yield "".join(
+                    json.dumps(json.loads(c.decode("utf-8")), ensure_ascii=False) + "\n" for c in bodies.values() if c is not None
+                ).encode("utf-8")
+                continue
+            # A single-file corpus never changes, so its lines are encoded once
+            key = ("export", start)
+            if key not in corpus.cache:
+                corpus.cache[key] = "".join(
+                    json.dumps(dict(corpus.recipes[rid], id=rid), ensure_ascii=False) + "\n" for rid in ids
+                ).encode("utf-8")
+            yield corpus.cache[key]
+
+    ##### Routing #####
+    def handle(self, path, query, if_none_match):
+        """
+        Resolve one GET request. Returns (status, etag, body) where body is
+        JSON-able data, or an iterator of bytes for streamed responses.
+        """
+        corpus = self.corpus()
+        parts = [unquote(p) for p in path.strip("/").split("/")]
+        etag = f'"{corpus.version}"'
+
+        if parts == ["recipes"] or parts == ["recipes", "search"] or (len(parts) == 2 and parts[0] == "tags"):
+            if etag_matches(if_none_match, etag):
+                return 304, etag, None
+            limit = query_int(query, "limit", DEFAULT_LIMIT, 1, MAX_LIMIT)
+            cursor = decode_cursor(query["cursor"][0]) if "cursor" in query else None
+            if parts[0] == "tags":
+                mask = corpus.facets.tag_mask([parts[1]])
+            elif parts == ["recipes", "search"]:
+                match = query.get("match", ["all"])[0]
+                if match not in ("all", "any"):
+                    raise HTTPError(400, "match must be 'all' or 'any'")
+                mask = corpus.facets.mask(query.get("q", [""])[0], query.get("tag", []), match == "all")
+            else:
+                mask = corpus.facets.everything()
+            return 200, etag, corpus.page(mask, cursor, limit)
+
+        if len(parts) == 2 and parts[0] == "recipes":
+            recipe, version = self.recipe(corpus, parts[1])
+            etag = f'"{version}"'
+            if etag_matches(if_none_match, etag):
+                return 304, etag, None
+            return 200, etag, recipe
+
+        if parts == ["tags"]:
+            if etag_matches(if_none_match, etag):
+                return 304, etag, None
+            return 200, etag, corpus.facets.tag_counts.to_dict()
+
+        if parts == ["export.jsonl"]:
+            # Split-layout bodies change (e.g. new ratings) without the manifest, so only single-file exports are cacheable
+            if corpus.split:
+                return 200, None, self.export(corpus)
+            if etag_matches(if_none_match, etag):
+                return 304, etag, None
+            return 200, etag, self.export(corpus)
+
+        raise HTTPError(404, "not found")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+
+        headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]}
+        use_gzip = "gzip" in headers.get("accept-encoding", "")
+        loop = asyncio.get_running_loop()
+        try:
+            if scope["method"] not in ("GET", "HEAD"):
+                raise HTTPError(405, "read-only API: only GET is supported")
+            query = parse_query(scope.get("query_string", b"").decode("utf-8"))
+            # Reads may wait on GitHub (cold cache), so keep them off the event loop
+            status, etag, body = await loop.run_in_executor(
+                None, self.handle, scope["path"], query, headers.get("if-none-match")
+            )
+        except HTTPError as e:
+            status, etag, body = e.status, None, {"error": e.message}
+
+        response_headers = [(b"vary", b"Accept-Encoding"), (b"cache-control", b"no-cache")]
+        if etag:
+            response_headers.append((b"etag", etag.encode("ascii")))
+        if status == 304:
+            await send({"type": "http.response.start", "status": 304, "headers": response_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if isinstance(body, (dict, list)):
+            data = json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            response_headers.append((b"content-type", b"application/json; charset=utf-8"))
+            if use_gzip and len(data) >= GZIP_MIN_BYTES:
+                data = gzip.compress(data, 6)
+                response_headers.append((b"content-encoding", b"gzip"))
+            response_headers.append((b"content-length", str(len(data)).encode("ascii")))
+            await send({"type": "http.response.start", "status": status, "headers": response_headers})
+            await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else data})
+            return
+
+        # Streamed export: each chunk is produced off the event loop and sent as it is ready
+        response_headers.append((b"content-type", b"application/x-ndjson; charset=utf-8"))
+        if use_gzip:
+            response_headers.append((b"content-encoding", b"gzip"))
+        await send({"type": "http.response.start", "status": status, "headers": response_headers})
+        if scope["method"] == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+            return
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if use_gzip else None
+        while True:
+            chunk = await loop.run_in_executor(None, next, body, None)
+            if chunk is None:
+                break
+            if compressor:
+                chunk = compressor.compress(chunk)
+            if chunk:
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": compressor.flush() if compressor else b""})
+
+
+def parse_query(query_string):
+    """ parse_qs(), which drops blank parameters; a blank cursor is kept so it is rejected rather than read as page 1. """
+    query = parse_qs(query_string)
+    if "cursor" not in query and "cursor" in parse_qs(query_string, keep_blank_values=True):
+        query["cursor"] = [""]
+    return query
+
+
+def query_int(query, name, default, low, high):
+    try:
+        value = int(query.get(name, [default])[0])
+    except ValueError:
+        raise HTTPError(400, f"{name} must be an integer")
+    return max(low, min(high, value))
+
+
+app = RecipeAPI()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port)
@@ -1,181 +1,262 @@
 import json
 import os
+import hashlib
+import math
+import time
+import uuid
 import streamlit as st
-import requests
-import base64
-from collections import Counter
+import numpy as np
 import pandas as pd
 import plotly.express as px
 from streamlit_plotly_events import plotly_events
+import snapshot
+import recipe_store
+from github_api import GitHubRepo
+from local_store import LocalStore
+from similar import SimilarityIndex
+from facets import FacetIndex
+from analytics import CorpusAnalytics
+from ingredients import IngredientTable, format_quantity
 
 ## Store selected tag from bar chart 
 if "selected_tag" not in st.session_state:
     st.session_state.selected_tag = None
 
-## Save new recipes permanently to recipes.json in github
-def save_recipes(recipes_list):
-    """ Save the recipes list back to GitHub using the GitHub Contents API. Overwrites recipes.json with a new commit. """
-    token = st.secrets["github_token"]
-    repo = st.secrets["github_repo"]
-    branch = st.secrets.get("github_branch", "main")
-    path = st.secrets.get("recipes_file_path", "recipes.json")
-
-    api_url = f"https://api.github.com/repos/{repo}/contents/{path}"
-    sha_resp = requests.get(api_url)
-    if sha_resp.status_code == 200:
-        sha = sha_resp.json()["sha"]
-    else:
-        st.error("⚠️ Could not fetch file SHA from GitHub.")
-        return False
-
-    new_content = json.dumps(recipes_list, indent=2).encode("utf-8")
-    encoded = base64.b64encode(new_content).decode("utf-8")
-
-    payload = {
-        "message": "Update recipes.json from Streamlit app",
-        "content": encoded,
-        "sha": sha,
-        "branch": branch
-    }
-
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github+json"
-    }
-
-    res = requests.put(api_url, headers=headers, json=payload)
-    if res.status_code in (200, 201):
-        return True
-    else:
-        st.error(f"❌ Failed saving recipes to GitHub: {res.text}")
-        return False
-
-
-def save_deleted(deleted_list):
-    """ Optional: save deleted recipes to deleted_recipes.json in GitHub. Creates file if missing. """
-    token = st.secrets["github_token"]
-    repo = st.secrets["github_repo"]
-    branch = st.secrets.get("github_branch", "main")
-    path = "deleted_recipes.json"
+## Identifies this session's writes, so only it is told about their conflicts
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
 
-    api_url = f"https://api.github.com/repos/{repo}/contents/{path}"
-    sha = None
-    sha_resp = requests.get(api_url)
-    if sha_resp.status_code == 200:
-        sha = sha_resp.json()["sha"]
+## Save new recipes permanently to recipes.json in github
+def save_recipes(recipes_list, message, edits=None):
+    """
+    Save the recipes list back to GitHub. The write is queued locally and pushed by the background sync;
+    `edits` (see recipe_store.apply_edits) let it be replayed if another instance saved first.
+    """
+    # Split layout: recipes_list is the summary manifest. A .snap path stores the compact binary
+    # snapshot, reusing the records of unchanged recipes from the version that was loaded
+    base = get_decoded_files().get(RECIPES_PATH, (None, None))[1]
+    store.write(RECIPES_PATH, recipe_store.encode(RECIPES_PATH, recipes_list, base), message, edits, st.session_state.session_id)
+    return True
 
-    new_content = json.dumps(deleted_list, indent=2).encode("utf-8")
-    encoded = base64.b64encode(new_content).decode("utf-8")
 
-    payload = {
-        "message": "Update deleted recipes",
-        "content": encoded,
-        "branch": branch
-    }
-    if sha:
-        payload["sha"] = sha
+def save_github_json(file_path, data, message, edits=None):
+    """ Save any JSON file to GitHub (queued locally, pushed by the background sync). Creates file if missing. """
+    store.write(file_path, recipe_store.encode(file_path, data), message, edits, st.session_state.session_id)
+    return True
 
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/vnd.github+json"
-    }
 
-    res = requests.put(api_url, headers=headers, json=payload)
-    return res.status_code in (200, 201)
+def save_deleted(deleted_list, message, edits=None):
+    """ Optional: save deleted recipes to deleted_recipes.json in GitHub. Creates file if missing. """
+    return save_github_json("deleted_recipes.json", deleted_list, message, edits)
 
 
 ##### Set Up #####
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
 # GitHub secrets
 GITHUB_TOKEN = st.secrets["github_token"]
 GITHUB_REPO = st.secrets["github_repo"]
 GITHUB_BRANCH = st.secrets.get("github_branch", "main")
 RECIPES_FILE = st.secrets.get("recipes_file_path", "recipes.json")
-
-# Load recipes from GitHub using the API (authenticated)
+# Override to point the app at a GitHub Enterprise host or a local stand-in
+GITHUB_API_URL = st.secrets.get("github_api_url", "https://api.github.com").rstrip("/")
+# "split" keeps a summary manifest plus one file per recipe under RECIPES_DIR (see recipe_store.py)
+RECIPES_LAYOUT = st.secrets.get("recipes_layout", "single")
+RECIPES_DIR = st.secrets.get("recipes_dir", "recipes")
+
+# Local-first copy of the repo files, shared by all sessions and kept in sync by a background thread
+@st.cache_resource
+def get_store():
+    remote = GitHubRepo(GITHUB_REPO, GITHUB_TOKEN, GITHUB_BRANCH, GITHUB_API_URL)
+    cache_dir = st.secrets.get("cache_dir", os.path.join(APP_DIR, ".recipe_cache"))
+    # Files bundled with the app serve the first render before GitHub has answered
+    seeds = {name: os.path.join(APP_DIR, name) for name in ("recipes.json", "deleted_recipes.json")}
+    store = LocalStore(remote, cache_dir, seeds, interval=st.secrets.get("sync_interval", 30), replay=recipe_store.replay)
+    if RECIPES_LAYOUT == "split":
+        # Recipe bodies are kept current by listing their directory, not by watching each one
+        store.watch_dir(RECIPES_DIR)
+    return store.start()
+
+store = get_store()
+# Data version this run renders; sync_status() reruns the app when it changes
+st.session_state.store_version = store.version
+
+# Decode a JSON file read from the store
+def decode_json(content):
+    if content is None:
+        # If file does not exist, return empty list
+        return []
+    return json.loads(content.decode("utf-8"))
+
+# Load any JSON file from the local copy of the GitHub repo
+def load_github_json(file_path, watch=True):
+    return decode_json(store.read(file_path, watch))
+
+# Load one full recipe on demand (split layout only). The background sync re-fetches cached bodies
+# whose sha changed in the directory listing (e.g. ratings saved elsewhere) and bumps store.version
+@st.cache_data(show_spinner=False)
+def load_recipe_body(recipe_id, version):
+    return load_github_json(recipe_store.body_path(recipe_id, RECIPES_DIR), watch=False) or None
+
+# Everything this run needs, read in one go so a cold cache fetches them from GitHub concurrently.
+# The recycle bin is only read while its sidebar section is open.
+RECIPES_PATH = f"{RECIPES_DIR}/{recipe_store.MANIFEST_FILE}" if RECIPES_LAYOUT == "split" else RECIPES_FILE
+startup_paths = [RECIPES_PATH]
+if st.session_state.get("show_recycle_bin"):
+    startup_paths.append("deleted_recipes.json")
+startup_files = store.read_many(startup_paths)
+
+# Decoded recipe files, shared by all sessions: path -> (content, decoded). A snapshot is kept as a
+# lazy SnapshotReader, so each recipe is decompressed once per version of the file
+@st.cache_resource
+def get_decoded_files():
+    return {}
+
+# Load recipes from the local copy (fetched from GitHub only if nothing is cached yet)
 def load_recipes():
-    token = st.secrets["github_token"]
-    repo = st.secrets["github_repo"]
-    branch = st.secrets.get("github_branch", "main")
-    path = st.secrets.get("recipes_file_path", "recipes.json")
-
-    api_url = f"https://api.github.com/repos/{repo}/contents/{path}?ref={branch}"
-    headers = {"Authorization": f"Bearer {token}"}
-
-    resp = requests.get(api_url, headers=headers)
-    if resp.status_code == 200:
-        import base64
-        content = resp.json()["content"]
-        recipes = json.loads(base64.b64decode(content).decode("utf-8"))
-        return recipes
-    else:
-        st.error(f"Failed to load recipes from GitHub: {resp.text}")
+    content = startup_files[RECIPES_PATH]
+    if content is None:
+        if RECIPES_LAYOUT != "split":
+            st.error(f"Failed to load recipes from GitHub: {store.last_error or 'file not found'}")
         return []
+    decoded = get_decoded_files()
+    cached = decoded.get(RECIPES_PATH)
+    if cached is None or cached[0] is not content:
+        if RECIPES_PATH.endswith(snapshot.SUFFIX):
+            cached = decoded[RECIPES_PATH] = (content, snapshot.SnapshotReader(content))
+        else:
+            cached = decoded[RECIPES_PATH] = (content, json.loads(content.decode("utf-8")))
+    # Each run gets its own list, since adds and deletes change it
+    return list(cached[1])
 
 recipes = load_recipes()
-##### Recipe Metrics #####
-def get_tag_counts(recipes):
-    tags = []
-    for r in recipes:
-        tags.extend([t.strip().lower() for t in r.get("tags", [])])
-    return Counter(tags)
 
-tag_counts = get_tag_counts(recipes)
-total_recipes = len(recipes)
+# Save a change to one recipe (in the split layout only its body file is rewritten)
+def save_recipe(recipe, message, edits=None):
+    if RECIPES_LAYOUT == "split":
+        saved = save_github_json(recipe_store.body_path(recipe["id"], RECIPES_DIR), recipe, message, edits)
+        load_recipe_body.clear(recipe["id"], store.version)
+        return saved
+    return save_recipes(recipes, message, edits)
+
+# Add a full recipe to the recipes list and save it (in the split layout its body is saved first)
+def add_recipe(recipe, message):
+    entry = recipe
+    if RECIPES_LAYOUT == "split":
+        # Identical recipes (or a restored one whose id was reused meanwhile) must not share a body file
+        recipe["id"] = recipe_store.unique_id(recipe, {r.get("id") for r in recipes})
+        save_github_json(recipe_store.body_path(recipe["id"], RECIPES_DIR), recipe, message)
+        entry = recipe_store.summarize(recipe)
+    recipes.append(entry)
+    return save_recipes(recipes, message, [{"add": entry}])
+
+##### Similar Recipes #####
+# Ids of the recipes in this run (the split layout stores them, the single file does not)
+recipe_ids = [r["id"] for r in recipes] if RECIPES_LAYOUT == "split" else recipe_store.assign_ids(recipes)
+
+# One neighbour index per process, shared by all sessions and updated incrementally as recipes change
+@st.cache_resource
+def get_similarity_index():
+    return SimilarityIndex(k=5)
+
+similarity_index = get_similarity_index()
+similarity_index.sync(dict(zip(recipe_ids, recipes)))
+
+##### Facet Index #####
+# Identity of the corpus in this run (changes when recipes are added or removed)
+corpus_key = hashlib.sha1("\n".join(recipe_ids).encode("utf-8")).hexdigest()
+
+# Numeric/tag/search columns for the sidebar filters, built once per corpus
+@st.cache_resource(max_entries=4)
+def get_facet_index(corpus_key, _recipes):
+    return FacetIndex(_recipes)
+
+facet_index = get_facet_index(corpus_key, recipes)
 
-DISPLAY_TAGS = [
-    "chicken",
-    "vegetarian",
-    "fish",
-    "side",
-    "dessert"
-]
-
-# Load any JSON file from GitHub using the API
-def load_github_json(file_path):
-    token = st.secrets["github_token"]
-    repo = st.secrets["github_repo"]
-    branch = st.secrets.get("github_branch", "main")
-
-    api_url = f"https://api.github.com/repos/{repo}/contents/{file_path}?ref={branch}"
-    headers = {"Authorization": f"Bearer {token}"}
-
-    resp = requests.get(api_url, headers=headers)
-    if resp.status_code == 200:
-        import base64
-        content = resp.json()["content"]
-        return json.loads(base64.b64decode(content).decode("utf-8"))
-    else:
-        # If file does not exist, return empty list
-        return []
+##### Recipe Metrics #####
+# Dashboard aggregates, one per process, refreshed incrementally as recipes are added, removed or rated
+@st.cache_resource
+def get_corpus_analytics():
+    return CorpusAnalytics()
+
+# Split layout: ratings are only in the body files, which a rating is the only write to. Each body's
+# ratings are decoded once per version of it: id -> (body content, ratings)
+@st.cache_resource
+def get_body_ratings():
+    return {}
+
+def load_body_ratings():
+    """ {id: ratings} for every body cached so far; the others are fetched by the background sync. """
+    paths = [recipe_store.body_path(rid, RECIPES_DIR) for rid in recipe_ids]
+    contents = store.read_many(paths, watch=False, wait=False)
+    decoded = get_body_ratings()
+    ratings = {}
+    for rid, path in zip(recipe_ids, paths):
+        content = contents[path]
+        if content is None:
+            continue
+        cached = decoded.get(rid)
+        if cached is None or cached[0] is not content:
+            cached = decoded[rid] = (content, json.loads(content.decode("utf-8")).get("ratings") or [])
+        ratings[rid] = cached[1]
+    return ratings
+
+corpus_analytics = get_corpus_analytics()
+if RECIPES_LAYOUT == "split":
+    body_ratings = load_body_ratings()
+    corpus_analytics.sync({rid: dict(r, ratings=body_ratings.get(rid, [])) for rid, r in zip(recipe_ids, recipes)})
+else:
+    body_ratings = None
+    corpus_analytics.sync(dict(zip(recipe_ids, recipes)))
+total_recipes = len(recipes)
 
-# Keep deleted_recipes in memory (load from GitHub if exists)
-deleted_recipes = load_github_json("deleted_recipes.json")
+# Deleted recipes, loaded on demand (from this run's startup read when the recycle bin is open)
+def load_deleted():
+    if "deleted_recipes.json" in startup_files:
+        return decode_json(startup_files["deleted_recipes.json"])
+    return load_github_json("deleted_recipes.json")
 
 st.markdown("<h1>Delaney's Cookbook!</h1>", unsafe_allow_html=True)
 
 
 ##### App Functions #####
+# Page switcher (sidebar)
+page = st.sidebar.radio("Page", ["Cookbook", "Meal plan"], horizontal=True, key="page")
+
 # Search recipes (sidebar)
 search_term = st.sidebar.text_input("Search recipes by title, ingredient, or tag")
 
-# Filter recipes based on search (sidebar)
-filtered_recipes = recipes
-
-# Search filter
-if search_term:
-    filtered_recipes = [
-        r for r in filtered_recipes
-        if search_term.lower() in r.get("title", "").lower()
-        or any(search_term.lower() in ing.lower() for ing in r.get("ingredients", []))
-        or any(search_term.lower() in tag.lower() for tag in r.get("tags", []))
-    ]
-
-# --- NEW: tag filter from bar chart ---
+# Facet filters (sidebar); a slider left at its full range is off
+with st.sidebar.expander("Filters"):
+    facet_tags = st.multiselect("Tags", list(facet_index.tag_counts.index))
+    match_all = st.radio("Match", ["All selected tags", "Any selected tag"], horizontal=True) == "All selected tags"
+
+    max_minutes = None
+    low, high = facet_index.minutes.bounds()
+    if high is not None:
+        top = int(math.ceil(high / 5) * 5)
+        value = st.slider("Ready in at most (minutes)", 0, top, top, step=5)
+        max_minutes = value if value < top else None
+
+    servings = None
+    low, high = facet_index.servings_low.bounds()[0], facet_index.servings_high.bounds()[1]
+    if high is not None and low < high:
+        value = st.slider("Servings", int(low), int(high), (int(low), int(high)))
+        servings = value if value != (int(low), int(high)) else None
+
+    temperature = None
+    low, high = facet_index.temperature.bounds()
+    if high is not None and low < high:
+        value = st.slider("Oven temperature (°F)", int(low), int(high), (int(low), int(high)), step=5)
+        temperature = value if value != (int(low), int(high)) else None
+
+# Filter recipes on search and facets as one boolean mask over the corpus
+mask = facet_index.mask(search_term, facet_tags, match_all, max_minutes, servings, temperature)
+
+# Tag picked on the bar chart
 if st.session_state.selected_tag:
-    filtered_recipes = [
-        r for r in filtered_recipes
-        if st.session_state.selected_tag in [t.lower() for t in r.get("tags", [])]
-    ]
+    mask &= facet_index.tag_mask([st.session_state.selected_tag])
+
+filtered_recipes = [recipes[i] for i in np.flatnonzero(mask)]
 
 # Recipe dropdown (sidebar)
 recipe_titles = sorted([r.get("title", "Untitled") for r in filtered_recipes])
@@ -207,99 +288,110 @@ with st.sidebar.form("add_recipe_form", clear_on_submit=True):
             "notes": notes,
             "tags": [t.strip() for t in tags_input.split(",") if t.strip()]
         }
-        recipes.append(new_recipe)
-        save_recipes(recipes)
+        add_recipe(new_recipe, f"Add '{title}'")
         st.success(f"✅ '{title}' added successfully!")
         st.rerun()
 
 
 # Recycle bin (sidebar)
 st.sidebar.header("🗑 Recycling Bin")
-if deleted_recipes:
-    deleted_titles = [r.get("title", "Untitled") for r in deleted_recipes]
-    selected_deleted = st.sidebar.selectbox("Deleted recipes", deleted_titles, key="deleted_recipe")
-    col1, col2 = st.sidebar.columns(2)
-    if col1.button("♻ Restore"):
-        recipe_to_restore = next((r for r in deleted_recipes if r.get("title") == selected_deleted), None)
-        if recipe_to_restore:
+if st.sidebar.toggle("Show deleted recipes", key="show_recycle_bin"):
+    deleted_recipes = load_deleted()
+    if deleted_recipes:
+        deleted_titles = [r.get("title", "Untitled") for r in deleted_recipes]
+        selected_deleted = st.sidebar.selectbox("Deleted recipes", deleted_titles, key="deleted_recipe")
+        col1, col2 = st.sidebar.columns(2)
+        if col1.button("♻ Restore"):
+            recipe_to_restore = next((r for r in deleted_recipes if r.get("title") == selected_deleted), None)
+            if recipe_to_restore:
+                deleted_recipes = [r for r in deleted_recipes if r.get("title") != selected_deleted]
+                add_recipe(recipe_to_restore, f"Restore '{selected_deleted}'")
+                save_deleted(deleted_recipes, f"Restore '{selected_deleted}'", [{"remove": selected_deleted}])
+                st.success(f"'{selected_deleted}' restored!")
+                st.rerun()
+        if col2.button("Permanent Delete"):
             deleted_recipes = [r for r in deleted_recipes if r.get("title") != selected_deleted]
-            recipes.append(recipe_to_restore)
-            save_recipes(recipes)
-            save_deleted(deleted_recipes)
-            st.success(f"'{selected_deleted}' restored!")
+            save_deleted(deleted_recipes, f"Permanently delete '{selected_deleted}'", [{"remove": selected_deleted}])
+            st.success(f"'{selected_deleted}' permanently deleted!")
             st.rerun()
-    if col2.button("Permanent Delete"):
-        deleted_recipes = [r for r in deleted_recipes if r.get("title") != selected_deleted]
-        save_deleted(deleted_recipes)
-        st.success(f"'{selected_deleted}' permanently deleted!")
-        st.rerun()
-else:
-    st.sidebar.info("Recycle Bin is empty.")
-
-##### Main display ######
-filtered_tag_counts = {
-    tag: tag_counts.get(tag, 0)
-    for tag in DISPLAY_TAGS
-}
-
-##### Main display ######
-if selected_title == "":
-    st.markdown("""
-    ## Welcome
-    Here you can:
-    - Select an existing recipe
-    - Search by title, ingredient, or tag
-    - Add new recipes
-    - Delete recipes and restore them later
-    """)
-
-    st.markdown(f"**{total_recipes}** recipes and counting!")
-
-    # ---- Tags to display ----
-    DISPLAY_TAGS = ["chicken", "vegetarian", "fish", "side", "dessert"]
+    else:
+        st.sidebar.info("Recycle Bin is empty.")
 
-    # ---- Filter tag counts ----
-    filtered_tag_counts = {
-        tag: tag_counts.get(tag, 0)
-        for tag in DISPLAY_TAGS
-    }
+## Rerun when the background sync applies a newer version from GitHub
+CONFLICT_SECONDS = 300
 
-    # ---- Build DataFrame ----
-    tag_df = pd.DataFrame(
-        filtered_tag_counts.items(),
-        columns=["Category", "Recipes"]
+@st.fragment(run_every=5)
+def sync_status():
+    if store.version != st.session_state.store_version:
+        st.rerun()
+    if store.pending:
+        st.caption(f"⏳ {store.pending} change(s) waiting to sync with GitHub")
+    if store.last_error:
+        st.caption("⚠️ GitHub is unreachable, showing the last saved copy.")
+    # This session's writes that ran into a change made elsewhere, for a few minutes
+    recent = [
+        c for c in store.conflicts
+        if st.session_state.session_id in c["owners"] and c["time"] > time.time() - CONFLICT_SECONDS
+    ]
+    for conflict in recent[-3:]:
+        if conflict["saved"]:
+            st.caption(f"🔀 Saved on top of a change made elsewhere: {conflict['message']}")
+        else:
+            st.caption(f"⚠️ Not saved, changed on GitHub in the meantime: {conflict['message']}")
+
+with st.sidebar:
+    sync_status()
+
+##### Recipe Rendering #####
+# Hash of everything the detail block shows (ratings are rendered separately)
+def recipe_content_hash(recipe, similar_titles):
+    shown = {k: v for k, v in recipe.items() if k != "ratings"}
+    return hashlib.sha1(json.dumps([shown, similar_titles], sort_keys=True).encode("utf-8")).hexdigest()
+
+# Render the static part of a recipe as a single markdown block, memoized by id and content hash,
+# so the browser gets one element instead of one per ingredient, step and note
+@st.cache_data(show_spinner=False, max_entries=256)
+def render_recipe_markdown(recipe_id, content_hash, _recipe, _similar_titles):
+    recipe = _recipe
+    # Plain markdown only: every field comes from the public add-recipe form, so no raw HTML is allowed
+    meta = "\u00a0 · \u00a0".join(
+        f"**{label}:** {recipe.get(key, 'N/A')}"
+        for label, key in (("Ready In", "ready_in"), ("Yield", "servings"), ("Temperature", "temperature"))
     )
+    parts = [f"## {recipe.get('title', 'Untitled')}", meta]
+
+    # Ingredients
+    parts.append("### Ingredients")
+    ingredients = recipe.get("ingredients", [])
+    parts.append("\n".join(f"- {item}" for item in ingredients) if ingredients else "_No ingredients listed._")
+
+    # Instructions
+    parts.append("### Preparation Steps")
+    instructions = recipe.get("instructions", [])
+    parts.append("\n".join(f"{i}. {step}" for i, step in enumerate(instructions, 1)) if instructions else "_No instructions provided._")
+
+    # Notes
+    parts.append("### Notes")
+    notes = recipe.get("notes", "")
+    if isinstance(notes, list):
+        parts.append("\n".join(f"- {note}" for note in notes) if notes else "_No notes provided._")
+    else:
+        parts.append(notes or "_No notes provided._")
 
-    # ---- Percent of total ----
-    tag_df["Percent"] = (tag_df["Recipes"] / total_recipes * 100).round(1) if total_recipes > 0 else 0
-    tag_df["Percent Label"] = tag_df["Percent"].astype(str) + "%"
+    # Tags
+    tags = recipe.get("tags", [])
+    if tags:
+        parts += ["### Tags", ", ".join(tags)]
 
-    # ---- Format Category names ----
-    tag_df["Category"] = tag_df["Category"].str.title()
+    # Similar recipes
+    if _similar_titles:
+        parts += ["### You might also like", "\n".join(f"- {t}" for t in _similar_titles)]
 
-    # ---- Sort by Recipes count ----
-    tag_df = tag_df.sort_values("Recipes", ascending=True)
-    
-    # ---- Container styling ----
-    st.markdown(
-        """
-        <div style="
-            background-color: #f5f8fc;
-            border-radius: 12px;
-        ">
-        """,
-        unsafe_allow_html=True
-    )
+    return "\n\n".join(parts)
 
-    # ---- Plotly horizontal bar chart ----
-    fig = px.bar(
-        tag_df,
-        x="Recipes",
-        y="Category",
-        orientation="h",
-        text="Recipes",
-    )
-    
+##### Dashboard Charts #####
+## Shared look for the welcome page charts
+def style_chart(fig, height=350, horizontal=True):
     fig.update_layout(
         plot_bgcolor="#E4EAF2",      # plotting area
         paper_bgcolor="#E4EAF2",     # entire figure
@@ -317,29 +409,143 @@ if selected_title == "":
             showticklabels=True,
             zeroline=False,
             title="",
-            categoryorder="total ascending",
             automargin=True
         ),
-        height=350,
+        height=height,
         showlegend=False,
         margin=dict(l=0, r=0, t=0, b=0),  # completely remove white margin
     )
-    
+    if horizontal:
+        fig.update_yaxes(categoryorder="total ascending")
+    fig.update_traces(marker_color="#556277", textposition="outside")
+    return fig
+
+## Horizontal bar chart of recipe counts, with percent of all recipes on hover
+def count_chart(counts, label, height=350):
+    df = pd.DataFrame({label: [str(k).title() for k in counts.index], "Recipes": counts.to_numpy()})
+    df["Percent Label"] = ((df["Recipes"] / total_recipes * 100).round(1) if total_recipes > 0 else 0).astype(str) + "%"
+    fig = px.bar(df, x="Recipes", y=label, orientation="h", text="Recipes")
+    style_chart(fig, height)
     fig.update_traces(
-        marker_color="#556277",
-        textposition="outside",
         hovertemplate="<b>%{y}</b><br>%{x} recipes<br>%{customdata[0]} of total<extra></extra>",
-        customdata=tag_df[["Percent Label"]],
+        customdata=df[["Percent Label"]],
     )
-    
-    # ---- Clickable chart ----
-    selected_points = plotly_events(
-        fig,
-        click_event=True,
-        hover_event=False,
-        select_event=False,
+    return fig
+
+##### Meal Plan #####
+# Every ingredient line parsed into arrays once per corpus (ratings do not change ingredients)
+@st.cache_resource(max_entries=4)
+def get_ingredient_table(corpus_key, _recipes, _ids):
+    return IngredientTable(_recipes, _ids)
+
+def meal_plan_page():
+    st.markdown("## Meal Plan")
+    titles_by_id = dict(zip(recipe_ids, (r.get("title", "Untitled") for r in recipes)))
+    planned = st.multiselect("Recipes", recipe_ids, format_func=titles_by_id.get, key="plan_recipes")
+    if not planned:
+        st.info("Pick recipes to get one shopping list for all of them.")
+        return
+
+    if RECIPES_LAYOUT == "split":
+        # Summaries have no ingredients, so only the planned recipes' bodies are parsed
+        table = IngredientTable([load_recipe_body(rid, store.version) or {} for rid in planned], planned)
+    else:
+        table = get_ingredient_table(corpus_key, recipes, recipe_ids)
+
+    # ---- Target servings per recipe ----
+    plan = []
+    for rid in planned:
+        base = table.servings[table.rows[rid]]
+        if base > 0:
+            servings = st.number_input(
+                f"Servings of {titles_by_id[rid]}", min_value=1, max_value=100,
+                value=max(1, int(round(base))), key=f"plan_servings_{rid}"
+            )
+        else:
+            st.caption(f"{titles_by_id[rid]}: no yield listed, so it is made as written.")
+            servings = None
+        plan.append((rid, servings))
+
+    # ---- Merged shopping list ----
+    shopping = table.shopping_list(plan)
+    measured = shopping[shopping["quantity"].notna()]
+    amounts = (measured["quantity"].map(format_quantity) + " " + measured["unit"]).str.strip()
+    st.markdown("### Shopping List")
+    st.dataframe(
+        pd.DataFrame({"Ingredient": measured["ingredient"], "Amount": amounts, "Recipes": measured["recipes"]}),
+        hide_index=True,
+        width="stretch",
     )
-    
+    unmeasured = sorted(set(shopping.loc[shopping["quantity"].isna(), "ingredient"]) - set(measured["ingredient"]))
+    if unmeasured:
+        st.markdown("**Also needed:** " + ", ".join(unmeasured))
+
+    lines = [f"{a} {i}".strip() for a, i in zip(amounts, measured["ingredient"])] + unmeasured
+    st.download_button("Download shopping list", "\n".join(lines), file_name="shopping_list.txt")
+
+##### Main display ######
+if page == "Meal plan":
+    meal_plan_page()
+
+elif selected_title == "":
+    st.markdown("""
+    ## Welcome
+    Here you can:
+    - Select an existing recipe
+    - Search by title, ingredient, or tag
+    - Add new recipes
+    - Delete recipes and restore them later
+    """)
+
+    st.markdown(f"**{total_recipes}** recipes and counting!")
+
+    tags_tab, ingredients_tab, time_tab, ratings_tab = st.tabs(["Tags", "Ingredients", "Cook time", "Ratings"])
+
+    # ---- Most common tags (click a bar to filter) ----
+    with tags_tab:
+        # ---- Container styling ----
+        st.markdown(
+            """
+            <div style="
+                background-color: #f5f8fc;
+                border-radius: 12px;
+            ">
+            """,
+            unsafe_allow_html=True
+        )
+
+        # ---- Clickable chart ----
+        selected_points = plotly_events(
+            count_chart(corpus_analytics.top_tags(10), "Category"),
+            click_event=True,
+            hover_event=False,
+            select_event=False,
+        )
+
+    # ---- Most common ingredients ----
+    with ingredients_tab:
+        st.plotly_chart(count_chart(corpus_analytics.top_ingredients(15), "Ingredient", height=450), width="stretch")
+
+    # ---- Cook time histogram ----
+    with time_tab:
+        minutes = corpus_analytics.minutes_histogram()
+        fig = px.bar(x=minutes.index, y=minutes.to_numpy(), text=minutes.to_numpy())
+        fig.update_traces(hovertemplate="<b>%{x}</b><br>%{y} recipes<extra></extra>")
+        st.plotly_chart(style_chart(fig, horizontal=False), width="stretch")
+
+    # ---- Rating distribution ----
+    with ratings_tab:
+        if corpus_analytics.ratings_count:
+            ratings = corpus_analytics.rating_distribution()
+            fig = px.bar(x=["⭐" * r for r in ratings.index], y=ratings.to_numpy(), text=ratings.to_numpy())
+            fig.update_traces(hovertemplate="<b>%{x}</b><br>%{y} ratings<extra></extra>")
+            st.plotly_chart(style_chart(fig, horizontal=False), width="stretch")
+            st.caption(f"{corpus_analytics.ratings_count} ratings, {corpus_analytics.average_rating:.1f} ⭐ on average")
+        else:
+            st.caption("No ratings yet.")
+        if body_ratings is not None and len(body_ratings) < total_recipes:
+            st.caption(f"Ratings of {len(body_ratings)} of {total_recipes} recipes loaded so far.")
+
     # ---- Handle selection ----
     if selected_points:
         st.session_state.selected_tag = selected_points[0]["y"].lower()
@@ -353,62 +559,31 @@ if selected_title == "":
     
 else:
     selected_recipe = next((r for r in filtered_recipes if r.get("title") == selected_title), None)
+    if selected_recipe and RECIPES_LAYOUT == "split":
+        selected_recipe = load_recipe_body(selected_recipe["id"], store.version)
     if selected_recipe:
-        st.header(selected_recipe.get("title", "Untitled"))
-
-        # Display recipe details
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.write(f"**Ready In:** {selected_recipe.get('ready_in', 'N/A')}")
-        with col2:
-            st.write(f"**Yield:** {selected_recipe.get('servings', 'N/A')}")
-        with col3:
-            st.write(f"**Temperature:** {selected_recipe.get('temperature', 'N/A')}")
-
-        # Ingredients
-        st.subheader("Ingredients")
-        ingredients = selected_recipe.get("ingredients", [])
-        if ingredients:
-            for item in ingredients:
-                st.markdown(f"- {item}")
-        else:
-            st.markdown("_No ingredients listed._")
-
-        # Instructions
-        st.subheader("Preparation Steps")
-        instructions = selected_recipe.get("instructions", [])
-        if instructions:
-            for i, step in enumerate(instructions, 1):
-                st.markdown(f"{i}. {step}")
-        else:
-            st.markdown("_No instructions provided._")
-
-        # Notes
-        st.subheader("Notes")
-        notes = selected_recipe.get("notes", "")
-        if notes:
-            if isinstance(notes, list):
-                for note in notes:
-                    st.markdown(f"- {note}")
-            else:
-                st.markdown(notes)
-        else:
-            st.markdown("_No notes provided._")
-
-        # Tags
-        tags = selected_recipe.get("tags", [])
-        if tags:
-            st.subheader("Tags")
-            st.markdown(", ".join(tags))
+        # Similar recipes (precomputed neighbours, so this is just a lookup)
+        selected_id = selected_recipe.get("id") or recipe_ids[next(i for i, r in enumerate(recipes) if r is selected_recipe)]
+        titles_by_id = dict(zip(recipe_ids, (r.get("title", "Untitled") for r in recipes)))
+        similar_titles = [
+            titles_by_id[rid] for rid, _ in similarity_index.similar(selected_id)
+            if titles_by_id.get(rid) not in (None, selected_title)
+        ]
+
+        # Display recipe details (one cached markdown block)
+        st.markdown(
+            render_recipe_markdown(selected_id, recipe_content_hash(selected_recipe, similar_titles), selected_recipe, similar_titles)
+        )
 
         # Ratings
         st.subheader("Rate this recipe")
         rating = st.slider("Your rating", 1, 5, 3, key=f"rating_{selected_title}")
         if st.button("Submit rating", key=f"submit_rating_{selected_title}"):
-            if "ratings" not in selected_recipe:
-                selected_recipe["ratings"] = []
-            selected_recipe["ratings"].append(rating)
-            save_recipes(recipes)
+            rated = dict(selected_recipe, ratings=list(selected_recipe.get("ratings") or []) + [rating])
+            if RECIPES_LAYOUT != "split":
+                # The loaded recipes are shared by all sessions, so the rated one is replaced, not changed
+                recipes[next(i for i, r in enumerate(recipes) if r is selected_recipe)] = rated
+            save_recipe(rated, f"Rate '{selected_title}' {rating} stars", [{"rate": selected_title, "rating": rating}])
             st.success(f"Thanks! You rated {selected_title} {rating} ⭐")
             st.rerun()
 
@@ -422,9 +597,10 @@ else:
         # Delete button
         if st.button("Delete Recipe", key="delete_recipe"):
             recipes = [r for r in recipes if r.get("title") != selected_title]
+            deleted_recipes = load_deleted()
             deleted_recipes.append(selected_recipe)
-            save_recipes(recipes)
-            save_deleted(deleted_recipes)
+            save_recipes(recipes, f"Delete '{selected_title}'", [{"remove": selected_title}])
+            save_deleted(deleted_recipes, f"Delete '{selected_title}'", [{"add": selected_recipe}])
             st.success(f"'{selected_title}' moved to Recycle Bin!")
             st.rerun()
     else:
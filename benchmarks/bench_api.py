@@ -0,0 +1,105 @@
+"""
+Throughput of the read-only recipe API (api.py).
+
+Serves the API with uvicorn over a LocalStore backed by the fake GitHub
+server, then hammers each endpoint from several client threads and
+reports requests per second and bytes per response. For comparison, the
+first row pulls recipes.json wholesale through the Contents API, the way
+other tools used to poll it.
+
+Usage:
+    python -m benchmarks.bench_api --clients 8 --requests 2000 --scale 1
+"""
+import argparse
+import socket
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from api import RecipeAPI
+from benchmarks.fake_github import FakeGitHub
+from benchmarks.load_test import scaled_corpus
+from github_api import GitHubRepo
+from local_store import LocalStore
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve(app):
+    """ Run uvicorn in a background thread; returns (base url, server). """
+    import uvicorn
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}", server
+
+
+def hammer(url, headers, clients, total):
+    """ GET url `total` times from `clients` threads; returns (requests/s, bytes per response, status). """
+    local = threading.local()
+
+    def one(_):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        # stream=True + raw read: count the bytes on the wire, not the decompressed body
+        resp = session.get(url, headers=headers, stream=True)
+        size = len(resp.raw.read(decode_content=False))
+        return resp.status_code, size
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(clients) as pool:
+        results = list(pool.map(one, range(total)))
+    elapsed = time.perf_counter() - start
+    statuses = {status for status, _ in results}
+    return total / elapsed, sum(size for _, size in results) / total, ",".join(map(str, sorted(statuses)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--scale", type=int, default=1, help="multiple of recipes.json")
+    args = parser.parse_args(argv)
+
+    corpus = scaled_corpus(args.scale)
+    with FakeGitHub({"recipes.json": corpus}).start() as github:
+        store = LocalStore(GitHubRepo("bench/cookbook", "bench", api_url=f"{github.url}/bench"),
+                           tempfile.mkdtemp(prefix="cookbook-bench-"), interval=3600, read_only=True)
+        base, server = serve(RecipeAPI(store))
+        try:
+            first = requests.get(f"{base}/recipes?limit=1").json()["items"][0]["id"]
+            etag = requests.get(f"{base}/recipes").headers["ETag"]
+            gz = {"Accept-Encoding": "gzip"}
+            cases = [
+                ("GitHub recipes.json (wholesale)", f"{github.url}/bench/repos/bench/cookbook/contents/recipes.json", {}),
+                ("/recipes page", f"{base}/recipes?limit=50", {"Accept-Encoding": "identity"}),
+                ("/recipes page, gzip", f"{base}/recipes?limit=50", gz),
+                ("/recipes page, If-None-Match", f"{base}/recipes?limit=50", dict(gz, **{"If-None-Match": etag})),
+                ("/recipes/search?q=chicken", f"{base}/recipes/search?q=chicken", gz),
+                ("/tags/dinner", f"{base}/tags/dinner", gz),
+                ("/recipes/<id>", f"{base}/recipes/{first}", gz),
+                ("/export.jsonl, gzip", f"{base}/export.jsonl", gz),
+                ("/export.jsonl, If-None-Match", f"{base}/export.jsonl", dict(gz, **{"If-None-Match": etag})),
+            ]
+            print(f"{len(corpus)} recipes, {args.clients} clients, {args.requests} requests per case")
+            print(f"{'case':<34} {'req/s':>8} {'bytes/resp':>11} {'status':>7}")
+            for name, url, headers in cases:
+                rps, size, status = hammer(url, headers, args.clients, args.requests)
+                print(f"{name:<34} {rps:>8.0f} {size:>11.0f} {status:>7}")
+        finally:
+            server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Cost of the welcome page dashboard aggregates as the corpus grows.
+
+For each corpus size, reports the one-off vectorised build of the
+analytics, the per-run cost once they are materialized (a no-op sync plus
+reading every chart's view), the incremental refresh after a recipe is
+rated or added, and, for comparison, rescanning every recipe's tags the
+way the welcome page used to on each run.
+
+Usage:
+    python -m benchmarks.bench_dashboard --scales 1 10 100 1000
+"""
+import argparse
+import time
+from collections import Counter
+
+import recipe_store
+from analytics import CorpusAnalytics
+from benchmarks.load_test import scaled_corpus
+
+
+def best_ms(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def read_views(analytics):
+    analytics.top_tags(10)
+    analytics.top_ingredients(15)
+    analytics.minutes_histogram()
+    analytics.rating_distribution()
+
+
+def rescan_tags(recipes):
+    tags = []
+    for r in recipes:
+        tags.extend([t.strip().lower() for t in r.get("tags", [])])
+    return Counter(tags)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100], help="multiples of recipes.json")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'recipes':>8} {'build ms':>9} {'views ms':>9} {'sync ms':>8} {'rate ms':>8} {'add ms':>8} {'rescan ms':>10}")
+    for scale in args.scales:
+        corpus = scaled_corpus(scale)
+        by_id = dict(zip(recipe_store.assign_ids(corpus), corpus))
+
+        start = time.perf_counter()
+        analytics = CorpusAnalytics()
+        analytics.build(by_id)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        read_views(analytics)
+        views_ms = best_ms(lambda: read_views(analytics), args.repeat)
+        sync_ms = best_ms(lambda: analytics.sync(by_id), args.repeat)
+
+        # Rate one recipe, then add one, and refresh the charts after each
+        rid = next(iter(by_id))
+
+        def rate():
+            by_id[rid] = dict(by_id[rid], ratings=(by_id[rid].get("ratings") or []) + [5])
+            analytics.sync(by_id)
+            read_views(analytics)
+        rate_ms = best_ms(rate, args.repeat)
+
+        added = iter(range(args.repeat))
+
+        def add():
+            by_id[f"new-{next(added)}"] = dict(corpus[0], title="New recipe")
+            analytics.sync(by_id)
+            read_views(analytics)
+        add_ms = best_ms(add, args.repeat)
+
+        rescan_ms = best_ms(lambda: rescan_tags(corpus), args.repeat)
+        print(f"{len(corpus):>8} {build_ms:>9.1f} {views_ms:>9.3f} {sync_ms:>8.2f} {rate_ms:>8.2f} {add_ms:>8.2f} {rescan_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
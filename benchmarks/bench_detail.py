@@ -0,0 +1,85 @@
+"""
+Element count and render time of the recipe detail view.
+
+Opens the longest recipes in recipes.json in app.py (via AppTest, against
+the fake GitHub server) and reports, per recipe, the number of elements
+in the main area, their serialized size (roughly the websocket payload)
+and the time of the rerun that renders the page. Pass --app to compare
+another version of the script, e.g. one checked out from git history.
+
+Usage:
+    python -m benchmarks.bench_detail --top 5
+    git show HEAD~1:app.py > /tmp/app_before.py && python -m benchmarks.bench_detail --app /tmp/app_before.py
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.fake_github import FakeGitHub
+from benchmarks.load_test import APP_PATH, ROOT, scaled_corpus
+
+
+def walk(node):
+    """ All elements under an AppTest tree node. """
+    children = getattr(node, "children", None)
+    if children is None:
+        yield node
+        return
+    for child in children.values():
+        yield from walk(child)
+
+
+def recipe_size(recipe):
+    return len(recipe.get("ingredients", [])) + len(recipe.get("instructions", [])) + \
+        (len(recipe["notes"]) if isinstance(recipe.get("notes"), list) else 1)
+
+
+def main(argv=None):
+    from streamlit.testing.v1 import AppTest
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default=APP_PATH, help="app script to measure")
+    parser.add_argument("--top", type=int, default=5, help="number of longest recipes to open")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    corpus = scaled_corpus(1)
+    longest = sorted(corpus, key=recipe_size, reverse=True)[:args.top]
+
+    # Scripts outside the repo still need to import its modules
+    app_path = os.path.abspath(args.app)
+    if os.path.dirname(app_path) != ROOT:
+        tmp_app = os.path.join(ROOT, f".bench_{os.getpid()}.py")
+        shutil.copy(app_path, tmp_app)
+        app_path = tmp_app
+
+    try:
+        with FakeGitHub({"recipes.json": corpus, "deleted_recipes.json": []}).start() as server:
+            at = AppTest.from_file(app_path, default_timeout=60)
+            at.secrets["github_token"] = "bench"
+            at.secrets["github_repo"] = "bench/cookbook"
+            at.secrets["github_api_url"] = f"{server.url}/bench"
+            at.secrets["cache_dir"] = tempfile.mkdtemp(prefix="cookbook-bench-")
+            at.run()
+
+            print(f"{'recipe':<45} {'lines':>5} {'elements':>8} {'bytes':>7} {'best ms':>8}")
+            for recipe in longest:
+                title = recipe["title"]
+                times = []
+                for _ in range(args.repeat):
+                    at.selectbox(key="recipe_select").select("").run()
+                    start = time.perf_counter()
+                    at.selectbox(key="recipe_select").select(title).run()
+                    times.append(time.perf_counter() - start)
+                elements = list(walk(at.main))
+                size = sum(len(e.proto.SerializeToString()) for e in elements if getattr(e, "proto", None) is not None)
+                print(f"{title[:45]:<45} {recipe_size(recipe):>5} {len(elements):>8} {size:>7} {min(times) * 1000:>8.1f}")
+    finally:
+        if app_path != os.path.abspath(args.app):
+            os.remove(app_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Build and query cost of the "you might also like" neighbour index.
+
+Reports the time to build the TF-IDF vectors and all top-k neighbour
+lists, the memory they take, the latency of a neighbour lookup, and the
+cost of the incremental add/remove used when recipes change.
+
+Usage:
+    python -m benchmarks.bench_similar --recipes 100000
+"""
+import argparse
+import random
+import time
+
+import recipe_store
+from benchmarks.load_test import scaled_corpus
+from similar import SimilarityIndex
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recipes", type=int, default=100000)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--queries", type=int, default=10000)
+    parser.add_argument("--updates", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    base = scaled_corpus(1)
+    corpus = scaled_corpus(-(-args.recipes // len(base)))[:args.recipes]
+    ids = recipe_store.assign_ids(corpus)
+    rng = random.Random(0)
+
+    index = SimilarityIndex(k=args.k, dim=args.dim)
+    start = time.perf_counter()
+    index.build(ids, corpus)
+    build_s = time.perf_counter() - start
+    mb = (index.vectors.nbytes + index.nbr.nbytes + index.nbr_score.nbytes) / 2 ** 20
+
+    sample = [rng.choice(ids) for _ in range(args.queries)]
+    start = time.perf_counter()
+    for rid in sample:
+        index.similar(rid)
+    query_us = (time.perf_counter() - start) / len(sample) * 1e6
+
+    # Incremental updates: remove random recipes, then add them back
+    removed = rng.sample(range(len(ids)), args.updates)
+    start = time.perf_counter()
+    for i in removed:
+        index.remove(ids[i])
+    remove_ms = (time.perf_counter() - start) / len(removed) * 1000
+    start = time.perf_counter()
+    for i in removed:
+        index.add(ids[i], corpus[i])
+    add_ms = (time.perf_counter() - start) / len(removed) * 1000
+
+    print(f"{len(corpus)} recipes, k={args.k}, dim={args.dim}")
+    print(f"build:  {build_s:.1f} s, {mb:.0f} MB of arrays")
+    print(f"query:  {query_us:.1f} us per lookup")
+    print(f"add:    {add_ms:.1f} ms per recipe")
+    print(f"remove: {remove_ms:.1f} ms per recipe")
+
+
+if __name__ == "__main__":
+    main()
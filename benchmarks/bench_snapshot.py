@@ -0,0 +1,93 @@
+"""
+Size and load-time benchmark: recipes.json (indent=2) vs the binary snapshot.
+
+For each corpus scale it reports the on-disk size, the base64 payload the
+Contents API ships, and the time to
+  - parse the whole corpus (json.loads vs snapshot.loads)
+  - open a memory-mapped snapshot and read one recipe lazily
+  - save the corpus after rating one recipe (json.dumps vs snapshot.dumps
+    against the reader it was loaded from)
+
+Usage:
+    python -m benchmarks.bench_snapshot --scale 1 10 100
+"""
+import argparse
+import base64
+import json
+import os
+import random
+import tempfile
+import time
+
+import snapshot
+from benchmarks.load_test import scaled_corpus
+
+
+def best_of(fn, repeat):
+    """ Fastest of `repeat` runs, in milliseconds. """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def bench_scale(scale, repeat):
+    corpus = scaled_corpus(scale)
+    as_json = json.dumps(corpus, indent=2).encode("utf-8")
+    start = time.perf_counter()
+    as_snap = snapshot.dumps(corpus)
+    encode_ms = (time.perf_counter() - start) * 1000
+    assert snapshot.loads(as_snap) == corpus
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "recipes.snap")
+        with open(path, "wb") as f:
+            f.write(as_snap)
+        i = random.Random(0).randrange(len(corpus))
+
+        def lazy_one():
+            with snapshot.open_snapshot(path) as reader:
+                reader[i]
+
+        lazy_ms = best_of(lazy_one, repeat)
+
+    # One rating added, the way app.py saves it: unchanged records are reused from the loaded reader
+    reader = snapshot.SnapshotReader(as_snap)
+    rated = list(reader)
+    rated[i] = dict(rated[i], ratings=list(rated[i].get("ratings") or []) + [5])
+
+    return {
+        "scale": scale,
+        "recipes": len(corpus),
+        "json_kb": len(as_json) / 1024,
+        "json_b64_kb": len(base64.b64encode(as_json)) / 1024,
+        "snap_kb": len(as_snap) / 1024,
+        "snap_b64_kb": len(base64.b64encode(as_snap)) / 1024,
+        "json_load_ms": best_of(lambda: json.loads(as_json.decode("utf-8")), repeat),
+        "snap_load_ms": best_of(lambda: snapshot.loads(as_snap), repeat),
+        "snap_lazy_one_ms": lazy_ms,
+        "snap_encode_ms": encode_ms,
+        "json_save_ms": best_of(lambda: json.dumps(rated, indent=2).encode("utf-8"), repeat),
+        "snap_save_ms": best_of(lambda: snapshot.dumps(rated, base=reader), repeat),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'recipes':>8} {'json KB':>9} {'b64 KB':>9} {'snap KB':>9} {'b64 KB':>9} "
+          f"{'json ms':>9} {'snap ms':>9} {'lazy ms':>8} {'json save':>10} {'snap save':>10}")
+    for scale in args.scale:
+        r = bench_scale(scale, args.repeat)
+        print(f"{r['recipes']:>8} {r['json_kb']:>9.0f} {r['json_b64_kb']:>9.0f} {r['snap_kb']:>9.0f} "
+              f"{r['snap_b64_kb']:>9.0f} {r['json_load_ms']:>9.1f} {r['snap_load_ms']:>9.1f} "
+              f"{r['snap_lazy_one_ms']:>8.2f} {r['json_save_ms']:>10.1f} {r['snap_save_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
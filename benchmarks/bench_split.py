@@ -0,0 +1,64 @@
+"""
+Startup cost of the single-file layout vs the split manifest/body layout.
+
+Serves both layouts from the fake GitHub server and measures what a cold
+run of app.py has to fetch before the first paint:
+  - single: recipes.json with every recipe's full body
+  - split:  recipes/index.json only; one body is fetched when a recipe opens
+
+Usage:
+    python -m benchmarks.bench_split --recipes 10000 --latency-ms 50
+"""
+import argparse
+import base64
+import json
+import time
+
+import requests
+
+import recipe_store
+from benchmarks.fake_github import FakeGitHub
+from benchmarks.load_test import scaled_corpus
+
+
+def fetch(url):
+    """ GET a file through the Contents API and decode it like app.py does; returns (wire bytes, ms). """
+    start = time.perf_counter()
+    resp = requests.get(url)
+    json.loads(base64.b64decode(resp.json()["content"]).decode("utf-8"))
+    return len(resp.content), (time.perf_counter() - start) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recipes", type=int, default=10000)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    base = scaled_corpus(1)
+    corpus = scaled_corpus(-(-args.recipes // len(base)))[:args.recipes]
+    manifest, bodies = recipe_store.split(corpus)
+    files = {
+        "recipes.json": corpus,
+        "recipes/" + recipe_store.MANIFEST_FILE: json.dumps(manifest, separators=(",", ":")).encode("utf-8"),
+    }
+    some_id = manifest[len(manifest) // 2]["id"]
+    files[recipe_store.body_path(some_id, "recipes")] = bodies[some_id]
+
+    with FakeGitHub(files, latency_ms=args.latency_ms).start() as server:
+        root = f"{server.url}/bench/repos/bench/cookbook/contents"
+        rows = [
+            ("single: recipes.json", f"{root}/recipes.json"),
+            ("split: index.json", f"{root}/recipes/{recipe_store.MANIFEST_FILE}"),
+            ("split: one body", f"{root}/{recipe_store.body_path(some_id, 'recipes')}"),
+        ]
+        print(f"{len(corpus)} recipes, {args.latency_ms:.0f} ms injected latency")
+        print(f"{'request':<22} {'wire KB':>9} {'best ms':>9}")
+        for label, url in rows:
+            results = [fetch(url) for _ in range(args.repeat)]
+            print(f"{label:<22} {results[0][0] / 1024:>9.0f} {min(ms for _, ms in results):>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Cold-load wall time of the documents app.py reads at startup.
+
+Serves recipes.json and deleted_recipes.json from the fake GitHub server
+with an injected latency and reads them through a LocalStore with an
+empty cache (no bundled seeds), the way a fresh deployment starts:
+  - serial:     recipes, then the recycle bin, one after the other
+  - concurrent: both in one read_many() call
+  - lazy bin:   recipes only; the recycle bin waits until it is opened
+
+Then runs app.py itself cold (split layout, whose manifest is not bundled)
+with the recycle bin closed and open.
+
+Usage:
+    python -m benchmarks.bench_startup --latency-ms 100
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+import recipe_store
+from benchmarks.fake_github import FakeGitHub
+from benchmarks.load_test import APP_PATH, scaled_corpus
+from github_api import GitHubRepo
+from local_store import LocalStore
+
+FILES = ["recipes.json", "deleted_recipes.json"]
+
+
+def cold_store(server):
+    remote = GitHubRepo("bench/cookbook", "bench", api_url=f"{server.url}/bench")
+    return LocalStore(remote, tempfile.mkdtemp(prefix="cookbook-bench-"))
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def cold_app(server, show_bin):
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    # A fresh LocalStore (and indexes) as in a newly started server process
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    at = AppTest.from_file(APP_PATH, default_timeout=60)
+    at.secrets["github_token"] = "bench"
+    at.secrets["github_repo"] = "bench/cookbook"
+    at.secrets["github_api_url"] = f"{server.url}/bench"
+    at.secrets["cache_dir"] = tempfile.mkdtemp(prefix="cookbook-bench-")
+    at.secrets["recipes_layout"] = "split"
+    at.secrets["sync_interval"] = 3600
+    at.session_state["show_recycle_bin"] = show_bin
+    start = time.perf_counter()
+    at.run()
+    elapsed = (time.perf_counter() - start) * 1000
+    assert not at.exception, at.exception
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--scale", type=int, default=1, help="multiple of recipes.json")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    corpus = scaled_corpus(args.scale)
+    deleted = corpus[:3]
+    manifest, bodies = recipe_store.split(corpus)
+    files = {"recipes.json": corpus, "deleted_recipes.json": deleted, f"recipes/{recipe_store.MANIFEST_FILE}": manifest}
+
+    with FakeGitHub(files, latency_ms=args.latency_ms).start() as server:
+        def serial():
+            store = cold_store(server)
+            for path in FILES:
+                store.read(path, watch=False)
+
+        def concurrent():
+            cold_store(server).read_many(FILES, watch=False)
+
+        def lazy():
+            cold_store(server).read_many(FILES[:1], watch=False)
+
+        print(f"{len(corpus)} recipes, {args.latency_ms:.0f} ms injected latency, median of {args.repeat}")
+        print("LocalStore, empty cache:")
+        for name, fn in (("serial", serial), ("concurrent", concurrent), ("lazy bin", lazy)):
+            print(f"  {name:<12} {timed(fn, args.repeat):8.1f} ms")
+
+        # The first AppTest run pays for importing Streamlit and the app's modules
+        cold_app(server, False)
+        print("app.py first run, empty cache (split layout):")
+        for name, show_bin in (("bin closed", False), ("bin open", True)):
+            print(f"  {name:<12} {timed(lambda: cold_app(server, show_bin), args.repeat):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Local stand-in for the GitHub Contents API, used by the benchmarks.
+
+Serves GET/PUT on /<session>/repos/<owner>/<repo>/contents/<path> with an
+optional injected latency. The leading <session> segment lets every
+simulated user point `github_api_url` at its own prefix so HTTP calls can
+be counted per session while all sessions share one file store. GETs carry
+an ETag and answer a matching If-None-Match with an empty 304, like GitHub.
+Directory listings are served on /<session>/repos/<owner>/<repo>/git/trees/<branch>:<dir>.
+"""
+import base64
+import hashlib
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from github_api import git_sha
+
+
+class FakeGitHub:
+    """ In-memory file store plus a threaded HTTP server in front of it. """
+
+    def __init__(self, files=None, latency_ms=0.0, host="127.0.0.1", port=0):
+        self.latency = latency_ms / 1000.0
+        self.lock = threading.Lock()
+        self.files = {}
+        self.calls = Counter()       # (session, method) -> count
+        self.conflicts = 0           # PUTs rejected because of a stale sha
+        self.not_modified = 0        # conditional GETs answered with a 304
+        for path, data in (files or {}).items():
+            self.put_file(path, data)
+
+        store = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                store._handle(self, "GET")
+
+            def do_PUT(self):
+                store._handle(self, "PUT")
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    ##### File store #####
+    def put_file(self, path, data):
+        """ Store a file; `data` may be bytes or any JSON-serialisable value. """
+        if not isinstance(data, bytes):
+            data = json.dumps(data, indent=2).encode("utf-8")
+        with self.lock:
+            self.files[path] = (data, git_sha(data))
+
+    def get_file(self, path):
+        """ Return the raw bytes stored at `path`, or None. """
+        with self.lock:
+            entry = self.files.get(path)
+        return entry[0] if entry else None
+
+    def get_json(self, path):
+        data = self.get_file(path)
+        return json.loads(data.decode("utf-8")) if data is not None else None
+
+    def session_calls(self, session):
+        with self.lock:
+            return sum(n for (s, _), n in self.calls.items() if s == session)
+
+    def total_calls(self):
+        with self.lock:
+            return sum(self.calls.values())
+
+    ##### HTTP #####
+    def _send(self, handler, status, body, etag=None):
+        payload = json.dumps(body).encode("utf-8") if body is not None else b""
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        if etag:
+            handler.send_header("ETag", etag)
+        handler.send_header("Content-Length", str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+    def _tree(self, handler, directory):
+        """ Git Trees API listing of the files directly in `directory`. """
+        prefix = f"{directory}/"
+        with self.lock:
+            tree = [
+                {"path": path[len(prefix):], "type": "blob", "sha": sha}
+                for path, (_, sha) in sorted(self.files.items())
+                if path.startswith(prefix) and "/" not in path[len(prefix):]
+            ]
+        if not tree:
+            return self._send(handler, 404, {"message": "Not Found"})
+        sha = hashlib.sha1(json.dumps(tree).encode("utf-8")).hexdigest()
+        etag = f'"{sha}"'
+        if handler.headers.get("If-None-Match") == etag:
+            with self.lock:
+                self.not_modified += 1
+            return self._send(handler, 304, None, etag)
+        return self._send(handler, 200, {"sha": sha, "tree": tree, "truncated": False}, etag)
+
+    def _handle(self, handler, method):
+        url_path = handler.path.split("?", 1)[0]
+        session, _, rest = url_path.lstrip("/").partition("/")
+
+        # Bookkeeping endpoint used by the load test, not counted as a call
+        if rest == "_calls":
+            return self._send(handler, 200, {"calls": self.session_calls(session)})
+
+        with self.lock:
+            self.calls[(session, method)] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        parts = rest.split("/", 4)
+        if method == "GET" and len(parts) == 5 and parts[0] == "repos" and parts[3] == "git" and parts[4].startswith("trees/"):
+            return self._tree(handler, parts[4].partition(":")[2].strip("/"))
+        if len(parts) < 5 or parts[0] != "repos" or parts[3] != "contents":
+            return self._send(handler, 404, {"message": "Not Found"})
+        path = parts[4]
+
+        if method == "GET":
+            with self.lock:
+                entry = self.files.get(path)
+            if entry is None:
+                return self._send(handler, 404, {"message": "Not Found"})
+            data, sha = entry
+            etag = f'"{sha}"'
+            if handler.headers.get("If-None-Match") == etag:
+                with self.lock:
+                    self.not_modified += 1
+                return self._send(handler, 304, None, etag)
+            return self._send(handler, 200, {
+                "path": path,
+                "sha": sha,
+                "size": len(data),
+                "encoding": "base64",
+                "content": base64.b64encode(data).decode("ascii"),
+            }, etag)
+
+        length = int(handler.headers.get("Content-Length", 0))
+        body = json.loads(handler.rfile.read(length) or b"{}")
+        data = base64.b64decode(body.get("content", ""))
+        with self.lock:
+            current = self.files.get(path)
+            if current is not None and body.get("sha") != current[1]:
+                self.conflicts += 1
+                conflict = True
+            elif current is None and body.get("sha"):
+                self.conflicts += 1
+                conflict = True
+            else:
+                conflict = False
+                sha = git_sha(data)
+                self.files[path] = (data, sha)
+        if conflict:
+            return self._send(handler, 409, {"message": f"{path} does not match {body.get('sha')}"})
+        return self._send(handler, 201 if current is None else 200, {"content": {"path": path, "sha": sha}})
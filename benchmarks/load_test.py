@@ -0,0 +1,298 @@
+"""
+Concurrent-session load test for app.py.
+
+Runs the Streamlit app headlessly with AppTest against a local fake of the
+GitHub Contents API (see fake_github.py). Each simulated user runs in its
+own process, because AppTest swaps global Streamlit state while a script
+runs, and drives a scripted session: typing a search, clicking tags,
+submitting ratings, adding and deleting a recipe.
+
+Reported per corpus scale:
+  - rerun latency percentiles for every action type
+  - HTTP calls made per action
+  - SHA conflicts: PUTs rejected by the server, and stale writes the
+    store merged onto GitHub's version or had to drop (read from each
+    session's own "Saved on top of" / "Not saved" captions)
+  - lost updates (ratings/adds/deletes that were submitted but are
+    missing afterwards)
+  - peak RSS of the session processes
+
+Usage:
+    python -m benchmarks.load_test --sessions 8 --scale 1 10 100 --latency-ms 50
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import requests
+
+from benchmarks.fake_github import FakeGitHub
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, "app.py")
+RECIPES_PATH = os.path.join(ROOT, "recipes.json")
+
+SEARCH_TERMS = ["chicken", "salmon", "garlic", "pasta", "lemon"]
+TAG_CLICKS = ["chicken", "vegetarian", "fish", "side", "dessert"]
+
+
+##### Corpus #####
+def scaled_corpus(scale, path=RECIPES_PATH):
+    """ Build a corpus `scale` times the size of recipes.json (copies get a numbered title). """
+    with open(path, "r", encoding="utf-8") as f:
+        base = json.load(f)
+    corpus = []
+    for n in range(scale):
+        for r in base:
+            copy = dict(r)
+            if n:
+                copy["title"] = f"{r.get('title', 'Untitled')} ({n})"
+            corpus.append(copy)
+    return corpus
+
+
+##### One simulated user #####
+class Session:
+    def __init__(self, session_id, base_url, timeout):
+        from streamlit.testing.v1 import AppTest
+
+        self.id = f"s{session_id}"
+        self.base_url = base_url
+        self.at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+        self.at.secrets["github_token"] = "load-test"
+        self.at.secrets["github_repo"] = "bench/cookbook"
+        self.at.secrets["github_api_url"] = f"{base_url}/{self.id}"
+        self.at.secrets["cache_dir"] = tempfile.mkdtemp(prefix=f"cookbook-{self.id}-")
+        self.latencies = defaultdict(list)
+        self.calls = defaultdict(list)
+        self.errors = 0
+        self.submitted = {"ratings": 0, "adds": [], "deletes": []}
+        self.conflicts = {"merged": set(), "dropped": set()}
+
+    def _calls(self):
+        return requests.get(f"{self.base_url}/{self.id}/_calls").json()["calls"]
+
+    def act(self, action, fn):
+        """ Run one interaction, recording its rerun latency and HTTP calls. """
+        before = self._calls()
+        start = time.perf_counter()
+        fn()
+        self.latencies[action].append(time.perf_counter() - start)
+        self.calls[action].append(self._calls() - before)
+        self.errors += len(self.at.exception)
+        self.collect_conflicts()
+
+    def collect_conflicts(self):
+        """ The sync status shows this session's recent conflicts; remember each one seen. """
+        for caption in self.at.caption:
+            if caption.value.startswith("🔀 Saved on top of a change made elsewhere"):
+                self.conflicts["merged"].add(caption.value)
+            elif caption.value.startswith("⚠️ Not saved, changed on GitHub"):
+                self.conflicts["dropped"].add(caption.value)
+
+    def text_input(self, label):
+        return next(w for w in self.at.text_input if w.label == label)
+
+    def text_area(self, label):
+        return next(w for w in self.at.text_area if w.label == label)
+
+    def run(self, iterations, rng):
+        at = self.at
+        self.act("load", at.run)
+        for it in range(iterations):
+            # Search typing: one rerun per keystroke, then clear the box
+            term = rng.choice(SEARCH_TERMS)
+            for i in range(1, len(term) + 1):
+                self.act("search", lambda: at.sidebar.text_input[0].input(term[:i]).run())
+            self.act("search", lambda: at.sidebar.text_input[0].input("").run())
+
+            # Tag clicks: the plotly click handler only stores the tag in session state
+            tag = rng.choice(TAG_CLICKS)
+            at.session_state["selected_tag"] = tag
+            self.act("tag_click", at.run)
+            at.session_state["selected_tag"] = None
+            self.act("tag_click", at.run)
+
+            # Rating submit
+            title = rng.choice(at.selectbox(key="recipe_select").options[1:])
+            self.act("select", lambda: at.selectbox(key="recipe_select").select(title).run())
+            at.slider(key=f"rating_{title}").set_value(rng.randint(1, 5))
+            self.act("rate", lambda: at.button(key=f"submit_rating_{title}").click().run())
+            self.submitted["ratings"] += 1
+            self.act("select", lambda: at.selectbox(key="recipe_select").select("").run())
+
+            # Add a recipe, then delete it again
+            new_title = f"Load Test {self.id}-{it}"
+            self.text_input("Recipe Title").input(new_title)
+            self.text_area("Ingredients (one per line)").input("1 cup flour\n2 eggs")
+            self.text_area("Instructions (one per line)").input("Mix.\nBake.")
+            self.text_input("Tags (comma-separated, e.g. Chicken, Main, Baked)").input("Load Test")
+            self.act("add", lambda: _submit_form(at))
+            self.submitted["adds"].append(new_title)
+
+            # A concurrent save from another session may already have dropped it
+            if new_title in at.selectbox(key="recipe_select").options:
+                self.act("select", lambda: at.selectbox(key="recipe_select").select(new_title).run())
+                if any(b.key == "delete_recipe" for b in at.button):
+                    self.act("delete", lambda: at.button(key="delete_recipe").click().run())
+                    self.submitted["deletes"].append(new_title)
+                self.act("select", lambda: at.selectbox(key="recipe_select").select("").run())
+
+    def drain(self, timeout):
+        """ Writes are pushed by the app's background sync; wait until none are pending. """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            self.at.run()
+            self.collect_conflicts()
+            if not any("waiting to sync" in c.value for c in self.at.caption):
+                return
+            time.sleep(0.2)
+
+    def result(self):
+        return {
+            "id": self.id,
+            "latencies": dict(self.latencies),
+            "calls": dict(self.calls),
+            "errors": self.errors,
+            "submitted": self.submitted,
+            "conflicts": {kind: len(seen) for kind, seen in self.conflicts.items()},
+            "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        }
+
+
+def _submit_form(at):
+    """ Click the add-recipe form's submit button. """
+    next(b for b in at.button if b.label == "Add Recipe").click().run()
+
+
+def run_session(session_id, base_url, iterations, timeout, seed):
+    """ Process entry point: play one scripted session and return its metrics. """
+    session = Session(session_id, base_url, timeout)
+    session.run(iterations, random.Random(seed + session_id))
+    session.drain(timeout)
+    return session.result()
+
+
+##### Reporting #####
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def summarize(results, server, scale, corpus_size, seed_ratings, wall):
+    latencies = defaultdict(list)
+    calls = defaultdict(list)
+    for r in results:
+        for action, values in r["latencies"].items():
+            latencies[action].extend(values)
+        for action, values in r["calls"].items():
+            calls[action].extend(values)
+
+    # Lost updates: submitted changes that are not in the final stored corpus
+    final = server.get_json("recipes.json") or []
+    final_titles = {r.get("title") for r in final}
+    final_ratings = sum(len(r.get("ratings", [])) for r in final)
+    submitted_ratings = sum(r["submitted"]["ratings"] for r in results)
+    adds = [t for r in results for t in r["submitted"]["adds"]]
+    deletes = set(t for r in results for t in r["submitted"]["deletes"])
+    lost_ratings = max(0, submitted_ratings - (final_ratings - seed_ratings))
+    lost_adds = sum(1 for t in adds if t not in deletes and t not in final_titles)
+    lost_deletes = sum(1 for t in deletes if t in final_titles)
+
+    actions = {}
+    for action, values in latencies.items():
+        actions[action] = {
+            "n": len(values),
+            "p50_ms": percentile(values, 50) * 1000,
+            "p90_ms": percentile(values, 90) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+            "http_calls_per_action": statistics.mean(calls[action]) if calls[action] else 0.0,
+        }
+    return {
+        "scale": scale,
+        "recipes": corpus_size,
+        "sessions": len(results),
+        "wall_s": wall,
+        "actions": actions,
+        "http_calls_total": server.total_calls(),
+        "sha_conflicts": {
+            "rejected": server.conflicts,
+            "merged": sum(r["conflicts"]["merged"] for r in results),
+            "dropped": sum(r["conflicts"]["dropped"] for r in results),
+        },
+        "lost_updates": {"ratings": lost_ratings, "adds": lost_adds, "deletes": lost_deletes},
+        "script_errors": sum(r["errors"] for r in results),
+        "max_rss_mb": max(r["max_rss_kb"] for r in results) / 1024,
+    }
+
+
+def print_report(report):
+    print(f"\n=== scale {report['scale']}x: {report['recipes']} recipes, "
+          f"{report['sessions']} sessions, {report['wall_s']:.1f}s wall ===")
+    print(f"{'action':<10} {'n':>5} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'calls/act':>10}")
+    for action, s in sorted(report["actions"].items()):
+        print(f"{action:<10} {s['n']:>5} {s['p50_ms']:>9.1f} {s['p90_ms']:>9.1f} "
+              f"{s['p99_ms']:>9.1f} {s['http_calls_per_action']:>10.2f}")
+    lost = report["lost_updates"]
+    conflicts = report["sha_conflicts"]
+    print(f"HTTP calls: {report['http_calls_total']}  SHA conflicts: {conflicts['rejected']} rejected by GitHub, "
+          f"{conflicts['merged']} merged / {conflicts['dropped']} dropped by the store")
+    print(f"lost updates: {lost['ratings']} ratings, {lost['adds']} adds, {lost['deletes']} deletes")
+    print(f"script errors: {report['script_errors']}  peak RSS per session: {report['max_rss_mb']:.0f} MB")
+
+
+##### Main #####
+def run_scale(scale, args):
+    corpus = scaled_corpus(scale)
+    seed_ratings = sum(len(r.get("ratings", [])) for r in corpus)
+    with FakeGitHub({"recipes.json": corpus, "deleted_recipes.json": []},
+                    latency_ms=args.latency_ms).start() as server:
+        start = time.perf_counter()
+        with ProcessPoolExecutor(args.sessions, mp_context=get_context("spawn")) as pool:
+            futures = [
+                pool.submit(run_session, i, server.url, args.iterations, args.timeout, args.seed)
+                for i in range(args.sessions)
+            ]
+            results = [f.result() for f in futures]
+        wall = time.perf_counter() - start
+        return summarize(results, server, scale, len(corpus), seed_ratings, wall)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=4, help="concurrent simulated users")
+    parser.add_argument("--iterations", type=int, default=2, help="scripted rounds per session")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1], help="corpus multipliers (1-1000)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="latency injected per HTTP call")
+    parser.add_argument("--timeout", type=float, default=60.0, help="AppTest timeout per rerun (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the raw report to this file")
+    args = parser.parse_args(argv)
+
+    reports = []
+    for scale in args.scale:
+        if not 1 <= scale <= 1000:
+            parser.error("--scale values must be between 1 and 1000")
+        report = run_scale(scale, args)
+        print_report(report)
+        reports.append(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+    return reports
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Pre-render the cookbook as a static site for read-only traffic.
+
+Writes one HTML page per recipe, an index page with client-side search,
+and search.json (the recipe_store manifest plus page URLs). The Streamlit
+app stays the place for adding, rating and deleting recipes.
+
+Builds are incremental: every page's inputs are hashed and recorded in
+.build-manifest.json, and only pages whose hash changed are re-rendered.
+The "you might also like" neighbour index is kept in .similar.npz and
+only updated for recipes added or removed since the last build (it is
+rebuilt once those changes pass a twentieth of the corpus). Pages
+are rendered in parallel across cores.
+
+Usage:
+    python build_site.py --src recipes.json --out site
+    python -m http.server -d site
+"""
+import argparse
+import hashlib
+import html
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import recipe_store
+import snapshot
+from similar import SimilarityIndex
+
+# Bump when the templates change so every page is rebuilt
+TEMPLATE_VERSION = "1"
+BUILD_MANIFEST = ".build-manifest.json"
+SIMILAR_INDEX = ".similar.npz"
+
+STYLE = """
+body { background-color: #e2ebf3; color: #556277; font-family: Helvetica, sans-serif; max-width: 760px; margin: 2em auto; padding: 0 1em; }
+h1 { color: #556277; }
+h2, h3 { color: #B15E6C; }
+a { color: #B15E6C; }
+.meta span { margin-right: 2em; }
+input { width: 100%; padding: .5em; font-size: 1em; border-radius: 8px; border: 1px solid #556277; }
+"""
+
+
+##### Templates #####
+def page(title, body):
+    return (
+        "<!DOCTYPE html>\n<html lang=\"en\">\n<head>\n<meta charset=\"utf-8\">\n"
+        "<meta name=\"viewport\" content=\"width=device-width, initial-scale=1\">\n"
+        f"<title>{html.escape(title)}</title>\n<style>{STYLE}</style>\n</head>\n"
+        f"<body>\n{body}\n</body>\n</html>\n"
+    )
+
+
+def items(values, tag="ul"):
+    return f"<{tag}>\n" + "\n".join(f"<li>{html.escape(str(v))}</li>" for v in values) + f"\n</{tag}>"
+
+
+def render_recipe(recipe, similar):
+    """ HTML for one recipe page; `similar` is a list of (id, title). """
+    e = html.escape
+    parts = [
+        '<p><a href="../index.html">&larr; All recipes</a></p>',
+        f"<h1>{e(recipe.get('title', 'Untitled'))}</h1>",
+        '<p class="meta">'
+        f"<span><b>Ready In:</b> {e(str(recipe.get('ready_in', 'N/A')))}</span>"
+        f"<span><b>Yield:</b> {e(str(recipe.get('servings', 'N/A')))}</span>"
+        f"<span><b>Temperature:</b> {e(str(recipe.get('temperature', 'N/A')))}</span></p>",
+        "<h3>Ingredients</h3>",
+        items(recipe["ingredients"]) if recipe.get("ingredients") else "<p><i>No ingredients listed.</i></p>",
+        "<h3>Preparation Steps</h3>",
+        items(recipe["instructions"], "ol") if recipe.get("instructions") else "<p><i>No instructions provided.</i></p>",
+        "<h3>Notes</h3>",
+    ]
+    notes = recipe.get("notes", "")
+    if isinstance(notes, list):
+        parts.append(items(notes))
+    elif notes:
+        parts.append("<p>" + e(notes).replace("\n", "<br>") + "</p>")
+    else:
+        parts.append("<p><i>No notes provided.</i></p>")
+    if recipe.get("tags"):
+        parts += ["<h3>Tags</h3>", f"<p>{e(', '.join(recipe['tags']))}</p>"]
+    ratings = recipe.get("ratings") or []
+    if ratings:
+        avg = sum(ratings) / len(ratings)
+        parts.append(f"<p>Average rating: {avg:.1f} {'⭐' * int(round(avg))}</p>")
+    if similar:
+        links = "\n".join(f'<li><a href="{e(rid)}.html">{e(title)}</a></li>' for rid, title in similar)
+        parts += ["<h3>You might also like</h3>", f"<ul>\n{links}\n</ul>"]
+    return page(recipe.get("title", "Untitled"), "\n".join(parts))
+
+
+def render_index(count):
+    body = f"""<h1>Delaney's Cookbook!</h1>
+<p><b>{count}</b> recipes and counting!</p>
+<input id="q" type="search" placeholder="Search recipes by title, ingredient, or tag" autofocus>
+<ul id="list"></ul>
+<script>
+let recipes = [];
+const list = document.getElementById("list");
+function show() {{
+  const q = document.getElementById("q").value.toLowerCase();
+  const hits = recipes.filter(r => !q
+    || r.title.toLowerCase().includes(q)
+    || r.search.includes(q)
+    || r.tags.some(t => t.toLowerCase().includes(q)));
+  list.innerHTML = hits.map(r => `<li><a href="${{r.url}}">${{r.title_html}}</a></li>`).join("");
+}}
+fetch("search.json").then(r => r.json()).then(data => {{ recipes = data; show(); }});
+document.getElementById("q").addEventListener("input", show);
+</script>"""
+    return page("Delaney's Cookbook", body)
+
+
+##### Build #####
+def content_hash(*parts):
+    data = json.dumps([TEMPLATE_VERSION, *parts], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _render_job(job):
+    """ Worker: render and write one recipe page. """
+    path, recipe, similar = job
+    _write(path, render_recipe(recipe, similar))
+    return path
+
+
+def build(recipes, out, workers=None, force=False, with_similar=True):
+    """ Build (or update) the site in `out`; returns counts of built, unchanged and removed pages. """
+    ids = recipe_store.assign_ids(recipes)
+    titles = {rid: r.get("title", "Untitled") for rid, r in zip(ids, recipes)}
+
+    neighbours = {}
+    if with_similar:
+        # Reuse the previous build's neighbour index; sync() only touches what changed
+        os.makedirs(out, exist_ok=True)
+        index_path = os.path.join(out, SIMILAR_INDEX)
+        index = SimilarityIndex(k=5) if force else SimilarityIndex.load(index_path, k=5)
+        index.sync(dict(zip(ids, recipes)))
+        index.save(index_path)
+        neighbours = {rid: [(n, titles[n]) for n, _ in index.similar(rid) if titles[n] != titles[rid]] for rid in ids}
+
+    manifest_path = os.path.join(out, BUILD_MANIFEST)
+    previous = {}
+    if os.path.exists(manifest_path) and not force:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+
+    hashes, jobs = {}, []
+    for rid, recipe in zip(ids, recipes):
+        rel = f"recipes/{rid}.html"
+        similar = neighbours.get(rid, [])
+        hashes[rel] = content_hash(recipe, similar)
+        if previous.get(rel) != hashes[rel] or not os.path.exists(os.path.join(out, rel)):
+            jobs.append((os.path.join(out, rel), recipe, similar))
+
+    # Index page and search data
+    search = []
+    for rid, recipe in zip(ids, recipes):
+        entry = recipe_store.summarize(dict(recipe, id=rid))
+        entry.setdefault("tags", [])
+        entry["url"] = f"recipes/{rid}.html"
+        entry["title_html"] = html.escape(entry.get("title", "Untitled"))
+        search.append(entry)
+    hashes["search.json"] = content_hash(search)
+    hashes["index.html"] = content_hash(len(recipes))
+    if previous.get("search.json") != hashes["search.json"] or not os.path.exists(os.path.join(out, "search.json")):
+        _write(os.path.join(out, "search.json"), json.dumps(search, separators=(",", ":")))
+    if previous.get("index.html") != hashes["index.html"] or not os.path.exists(os.path.join(out, "index.html")):
+        _write(os.path.join(out, "index.html"), render_index(len(recipes)))
+
+    # Render changed pages, in parallel when there are enough to be worth it
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(jobs) > 50:
+        with ProcessPoolExecutor(workers) as pool:
+            list(pool.map(_render_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    else:
+        for job in jobs:
+            _render_job(job)
+
+    # Drop pages of recipes that no longer exist
+    removed = 0
+    for rel in previous:
+        if rel not in hashes:
+            try:
+                os.remove(os.path.join(out, rel))
+                removed += 1
+            except OSError:
+                pass
+
+    _write(manifest_path, json.dumps(hashes, indent=2))
+    return {"built": len(jobs), "unchanged": len(ids) - len(jobs), "removed": removed}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--src", default="recipes.json", help="recipes JSON (or .snap snapshot)")
+    parser.add_argument("--out", default="site")
+    parser.add_argument("--workers", type=int, default=None, help="render processes (default: all cores)")
+    parser.add_argument("--force", action="store_true", help="rebuild every page")
+    parser.add_argument("--no-similar", action="store_true", help="skip the 'You might also like' lists")
+    args = parser.parse_args(argv)
+
+    if args.src.endswith(snapshot.SUFFIX):
+        with open(args.src, "rb") as f:
+            recipes = snapshot.loads(f.read())
+    else:
+        with open(args.src, "r", encoding="utf-8") as f:
+            recipes = json.load(f)
+
+    start = time.perf_counter()
+    counts = build(recipes, args.out, args.workers, args.force, not args.no_similar)
+    print(f"Built {counts['built']} pages, {counts['unchanged']} unchanged, {counts['removed']} removed "
+          f"in {time.perf_counter() - start:.2f}s -> {args.out}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Faceted filtering over the recipe corpus.
+
+`ready_in`, `servings` and `temperature` are free text ("30 minutes, plus
+1 hour to marinate", "4-6 servings", "375° F"). They are parsed once into
+numbers when the index is built. Each numeric column is kept alongside a
+sorted copy, so a range filter is two binary searches. Tags become one
+boolean array per tag, and title/ingredient/tag search runs over one
+lowercased string per recipe. Every filter produces a boolean mask;
+combining filters is a mask intersection.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+
+##### Parsing #####
+def parse_minutes(text):
+    """ Total minutes in a ready_in string; ranges count their upper end. NaN if there is no time unit. """
+    if not isinstance(text, str):
+        return np.nan
+    total, found = 0.0, False
+    for low, high, unit in re.findall(r"(\d+(?:\.\d+)?)\s*(?:-\s*(\d+(?:\.\d+)?))?\s*(hours?|hrs?|minutes?|mins?)\b", text.lower()):
+        value = float(high or low)
+        total += value * 60 if unit.startswith("h") else value
+        found = True
+    return total if found else np.nan
+
+
+def parse_servings(text):
+    """ (low, high) servings from e.g. "4", "4-6 servings"; NaNs for yields like "12 muffins". """
+    if not isinstance(text, str):
+        return np.nan, np.nan
+    m = re.fullmatch(r"\s*(\d+)\s*(?:-\s*(\d+))?\s*(servings?)?\s*", text.lower())
+    if not m:
+        return np.nan, np.nan
+    low = float(m.group(1))
+    return low, float(m.group(2) or low)
+
+
+def parse_temperature(text):
+    """ Oven temperature in °F (first number in the string); NaN for "n/a", "Broil", etc. """
+    if not isinstance(text, str):
+        return np.nan
+    m = re.search(r"(\d{3})\s*°?\s*F?", text)
+    return float(m.group(1)) if m else np.nan
+
+
+##### Index #####
+class RangeIndex:
+    """ A numeric column plus its sorted order, for range lookups by binary search. """
+
+    def __init__(self, values):
+        self.values = np.asarray(values, dtype=np.float64)
+        known = np.flatnonzero(~np.isnan(self.values))
+        self.order = known[np.argsort(self.values[known], kind="stable")]
+        self.sorted = self.values[self.order]
+
+    def mask(self, low=None, high=None):
+        """ Rows with low <= value <= high (either bound may be None); unknown values never match. """
+        start = 0 if low is None else np.searchsorted(self.sorted, low, side="left")
+        stop = len(self.sorted) if high is None else np.searchsorted(self.sorted, high, side="right")
+        out = np.zeros(len(self.values), dtype=bool)
+        out[self.order[start:stop]] = True
+        return out
+
+    def bounds(self):
+        return (self.sorted[0], self.sorted[-1]) if len(self.sorted) else (None, None)
+
+
+class FacetIndex:
+    def __init__(self, recipes):
+        self.size = len(recipes)
+        self.minutes = RangeIndex([parse_minutes(r.get("ready_in")) for r in recipes])
+        servings = [parse_servings(r.get("servings")) for r in recipes]
+        self.servings_low = RangeIndex([s[0] for s in servings])
+        self.servings_high = RangeIndex([s[1] for s in servings])
+        self.temperature = RangeIndex([parse_temperature(r.get("temperature")) for r in recipes])
+
+        # One boolean column per (lowercased) tag
+        tag_rows = {}
+        for i, r in enumerate(recipes):
+            for t in r.get("tags", []):
+                tag_rows.setdefault(t.strip().lower(), []).append(i)
+        self.tags = {}
+        for tag, rows in tag_rows.items():
+            column = np.zeros(self.size, dtype=bool)
+            column[rows] = True
+            self.tags[tag] = column
+        self.tag_counts = pd.Series({t: int(c.sum()) for t, c in self.tags.items()}, dtype=int).sort_values(ascending=False)
+
+        # Everything the sidebar search looks at, lowercased ("search" is the split layout's ingredient text)
+        self.haystack = pd.Series([
+            "\n".join([r.get("title", "")] + [str(i) for i in r.get("ingredients", [])] + [r.get("search", "")] + list(r.get("tags", []))).lower()
+            for r in recipes
+        ], dtype=object)
+
+    def everything(self):
+        return np.ones(self.size, dtype=bool)
+
+    def search_mask(self, term):
+        if not term:
+            return self.everything()
+        return self.haystack.str.contains(term.lower(), regex=False).to_numpy(dtype=bool)
+
+    def tag_mask(self, tags, match_all=True):
+        if not tags:
+            return self.everything()
+        columns = [self.tags.get(t.lower(), np.zeros(self.size, dtype=bool)) for t in tags]
+        return np.logical_and.reduce(columns) if match_all else np.logical_or.reduce(columns)
+
+    def servings_mask(self, low=None, high=None):
+        """ Recipes whose servings range overlaps [low, high]. """
+        return self.servings_low.mask(None, high) & self.servings_high.mask(low, None)
+
+    def mask(self, search="", tags=(), match_all=True, max_minutes=None, servings=None, temperature=None):
+        """ Combined mask for all active filters; None/empty means a filter is off. """
+        mask = self.search_mask(search) & self.tag_mask(tags, match_all)
+        if max_minutes is not None:
+            mask &= self.minutes.mask(None, max_minutes)
+        if servings is not None:
+            mask &= self.servings_mask(*servings)
+        if temperature is not None:
+            mask &= self.temperature.mask(*temperature)
+        return mask
@@ -0,0 +1,84 @@
+"""
+Minimal client for the GitHub Contents API.
+
+Kept free of Streamlit so it can be used from background threads and
+command-line tools as well as from app.py.
+"""
+import base64
+import hashlib
+
+import requests
+
+# get_if_changed() result when the file still matches the ETag given
+NOT_MODIFIED = "not modified"
+
+
+def git_sha(content):
+    """ SHA of a blob, computed the same way git (and the Contents API) does. """
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+class GitHubRepo:
+    def __init__(self, repo, token, branch="main", api_url="https://api.github.com", timeout=10):
+        self.repo = repo
+        self.branch = branch
+        self.api_url = api_url.rstrip("/")
+        self.timeout = timeout
+        self.headers = {
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github+json"
+        }
+
+    def url(self, path):
+        return f"{self.api_url}/repos/{self.repo}/contents/{path}"
+
+    def get(self, path):
+        """ Return (content bytes, sha) for a file, or None if it does not exist. Raises requests errors otherwise. """
+        found = self.get_if_changed(path)
+        return found[:2] if found is not None else None
+
+    def get_if_changed(self, path, etag=None):
+        """
+        Conditional get(): (content bytes, sha, etag), None if the file does not exist, or NOT_MODIFIED
+        if it still matches `etag` (a 304, which GitHub does not count against the rate limit).
+        """
+        headers = dict(self.headers, **{"If-None-Match": etag}) if etag else self.headers
+        resp = requests.get(self.url(path), headers=headers,
+                            params={"ref": self.branch}, timeout=self.timeout)
+        if resp.status_code == 304:
+            return NOT_MODIFIED
+        if resp.status_code == 404:
+            return None
+        resp.raise_for_status()
+        body = resp.json()
+        return base64.b64decode(body["content"]), body["sha"], resp.headers.get("ETag")
+
+    def list_dir(self, path, etag=None):
+        """
+        Blob shas of the files directly in a directory, in one Git Trees API call:
+        ({file path: sha}, etag), None if the directory does not exist, or NOT_MODIFIED if it still matches `etag`.
+        """
+        headers = dict(self.headers, **{"If-None-Match": etag}) if etag else self.headers
+        resp = requests.get(f"{self.api_url}/repos/{self.repo}/git/trees/{self.branch}:{path.strip('/')}",
+                            headers=headers, timeout=self.timeout)
+        if resp.status_code == 304:
+            return NOT_MODIFIED
+        if resp.status_code == 404:
+            return None
+        resp.raise_for_status()
+        entries = resp.json()["tree"]
+        shas = {f"{path.strip('/')}/{e['path']}": e["sha"] for e in entries if e["type"] == "blob"}
+        return shas, resp.headers.get("ETag")
+
+    def put(self, path, content, message, sha=None):
+        """ Create or overwrite a file with a new commit and return its new sha. """
+        payload = {
+            "message": message,
+            "content": base64.b64encode(content).decode("utf-8"),
+            "branch": self.branch
+        }
+        if sha:
+            payload["sha"] = sha
+        resp = requests.put(self.url(path), headers=self.headers, json=payload, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json()["content"]["sha"]
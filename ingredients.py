@@ -0,0 +1,247 @@
+"""
+Parse free-text ingredient lines ("1½ cups short-grain white rice, rinsed")
+into (quantity, unit, canonical name), and turn meal plans into merged
+shopping lists.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+FRACTIONS = {
+    "½": 1 / 2, "⅓": 1 / 3, "⅔": 2 / 3, "¼": 1 / 4, "¾": 3 / 4, "⅕": 1 / 5,
+    "⅖": 2 / 5, "⅗": 3 / 5, "⅘": 4 / 5, "⅙": 1 / 6, "⅚": 5 / 6, "⅛": 1 / 8,
+    "⅜": 3 / 8, "⅝": 5 / 8, "⅞": 7 / 8,
+}
+
+# Spellings seen in recipes.json -> canonical unit
+UNITS = {
+    "t": "tsp", "tsp": "tsp", "tsps": "tsp", "teaspoon": "tsp", "teaspoons": "tsp",
+    "tbsp": "tbsp", "tbsps": "tbsp", "tbs": "tbsp", "tablespoon": "tbsp", "tablespoons": "tbsp",
+    "c": "cup", "cup": "cup", "cups": "cup",
+    "oz": "oz", "ounce": "oz", "ounces": "oz",
+    "lb": "lb", "lbs": "lb", "pound": "lb", "pounds": "lb",
+    "g": "g", "gram": "g", "grams": "g", "kg": "kg",
+    "ml": "ml", "l": "l", "liter": "l", "liters": "l",
+    "pinch": "pinch", "dash": "dash",
+    "can": "can", "cans": "can", "clove": "clove", "cloves": "clove",
+    "sprig": "sprig", "sprigs": "sprig", "bunch": "bunch", "slice": "slice", "slices": "slice",
+}
+
+# Preparation words dropped from names so "minced garlic" and "garlic" count together
+PREP_WORDS = {
+    "chopped", "minced", "diced", "sliced", "grated", "fresh", "freshly", "finely",
+    "roughly", "coarsely", "thinly", "large", "small", "medium", "packed", "melted",
+    "crushed", "peeled", "halved", "quartered", "shredded", "cooked", "uncooked",
+    "ground", "dried", "softened", "divided", "optional", "about", "plus", "of",
+    "boneless", "skinless", "bone-in", "skin-on",
+}
+IRREGULAR_PLURALS = {"leaves": "leaf", "loaves": "loaf", "halves": "half"}
+NOT_PLURAL = {"asparagus", "hummus", "couscous", "molasses", "swiss", "brussels", "oats", "greens"}
+
+_FRACTION_CHARS = "".join(FRACTIONS)
+_NUMBER = rf"(?:\d+\s+\d+/\d+|\d+/\d+|\d+(?:\.\d+)?\s*[{_FRACTION_CHARS}]?|[{_FRACTION_CHARS}])"
+_QUANTITY = re.compile(rf"^\s*({_NUMBER})(?:\s*(?:-|to)\s*({_NUMBER}))?\s*")
+_EXTRA_AMOUNT = re.compile(rf"^(plus|minus)\s+({_NUMBER})\s*([A-Za-z]+)\.?(?=\s|$)\s*")
+
+
+def parse_number(text):
+    """ "1", "1.5", "1/2", "½", "1½", "1 ½", "1 1/2" -> float. """
+    total = 0.0
+    for part in re.findall(rf"\d+/\d+|\d+(?:\.\d+)?|[{_FRACTION_CHARS}]", text):
+        if part in FRACTIONS:
+            total += FRACTIONS[part]
+        elif "/" in part:
+            num, den = part.split("/")
+            total += float(num) / float(den) if float(den) else 0.0
+        else:
+            total += float(part)
+    return total
+
+
+def singular(word):
+    if word in IRREGULAR_PLURALS:
+        return IRREGULAR_PLURALS[word]
+    if word in NOT_PLURAL or len(word) <= 3 or word.endswith("ss"):
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith("oes"):
+        return word[:-2]
+    if word.endswith("s"):
+        return word[:-1]
+    return word
+
+
+def _drop_extra_amount(m):
+    """ "plus 2 tbsp" inside a name is a second amount, not part of the ingredient. """
+    return " " if m.group(1).rstrip(".") in UNITS else m.group(0)
+
+
+def ingredient_name(text):
+    """ Canonical name: lowercased, first alternative only, no notes/parentheticals/prep words, singular. """
+    text = text.lower()
+    text = re.sub(r"\([^)]*\)", " ", text)
+    text = re.sub(rf"\b(?:plus|minus)\s+{_NUMBER}\s*([a-z]+\.?)", _drop_extra_amount, text)
+    text = re.sub(r"\b(?:to taste|as needed|for (?:serving|garnish)).*", " ", text)
+    # Notes follow a comma ("garlic, minced"), but a leading segment may be all prep words ("boneless, skinless, ...")
+    for segment in re.split(r",|;", text):
+        # Keep the first alternative ("maple syrup or sugar"), unless it is only prep words ("fresh or frozen peas")
+        words = []
+        for alternative in re.split(r" or |/", segment):
+            words = [w for w in re.findall(r"[a-zà-ÿ'’-]+", alternative) if w not in PREP_WORDS]
+            if words:
+                break
+        if words:
+            words[-1] = singular(words[-1])
+            return " ".join(words)
+    return ""
+
+
+def parse_ingredient(line):
+    """
+    Split an ingredient line into (quantity, unit, name).
+
+    quantity is a float (ranges use their upper end, "1 cup plus 2 tbsp" is
+    1.125) or None when the line has no leading amount; unit is a canonical unit from UNITS or None for
+    plain counts ("2 eggs").
+    """
+    text = line.replace("\u00a0", " ").strip()
+    # "1½teaspoons" -> "1½ teaspoons"
+    text = re.sub(rf"^([\d{_FRACTION_CHARS}/.]+)(?=[a-zA-Z])", r"\1 ", text)
+    quantity, unit = None, None
+    m = _QUANTITY.match(text)
+    if m:
+        quantity = parse_number(m.group(2) or m.group(1))
+        text = text[m.end():]
+        # Parenthetical sizes such as "1 (14 oz) can" belong to the unit, not the name
+        text = re.sub(r"^\([^)]*\)\s*", "", text)
+        word = re.match(r"([A-Za-z]+)\.?(?=[\s/]|$)\s*", text)
+        if word and word.group(1).lower() in UNITS:
+            # A capital T is the usual shorthand for tablespoon
+            unit = "tbsp" if word.group(1) == "T" else UNITS[word.group(1).lower()]
+            text = text[word.end():]
+            # Drop a metric equivalent given alongside: "1 cup/241 grams yogurt"
+            text = re.sub(rf"^/\s*{_NUMBER}\s*[A-Za-z]+\.?\s*", "", text)
+            # "1 cup plus 2 tablespoons sugar": fold the second amount into the first
+            extra = _EXTRA_AMOUNT.match(text)
+            if extra and extra.group(3).lower() in UNITS:
+                other = UNITS[extra.group(3).lower()]
+                sizes = VOLUME if unit in VOLUME else WEIGHT
+                if other in sizes and unit in sizes:
+                    sign = 1 if extra.group(1) == "plus" else -1
+                    quantity += sign * parse_number(extra.group(2)) * sizes[other] / sizes[unit]
+                    text = text[extra.end():]
+    name = ingredient_name(text)
+    # "2 garlic cloves" is the same thing as "2 cloves garlic"
+    if quantity is not None and unit is None and name.endswith(" clove"):
+        unit, name = "clove", name[:-len(" clove")]
+    return quantity, unit, name
+
+
+##### Units #####
+# Size of each unit in its dimension's base unit: teaspoons for volume, ounces for weight
+VOLUME = {"tsp": 1.0, "tbsp": 3.0, "cup": 48.0, "ml": 1 / 4.92892, "l": 1000 / 4.92892}
+WEIGHT = {"oz": 1.0, "lb": 16.0, "g": 1 / 28.3495, "kg": 1000 / 28.3495}
+
+_EIGHTHS = {1: "⅛", 2: "¼", 3: "⅜", 4: "½", 5: "⅝", 6: "¾", 7: "⅞"}
+
+
+def measure_of(unit):
+    """ What a unit measures: "volume", "weight", or the unit itself for counts ("clove", "can", "" for plain counts). """
+    if unit in VOLUME:
+        return "volume"
+    if unit in WEIGHT:
+        return "weight"
+    return unit or ""
+
+
+def format_quantity(value):
+    """ 1.5 -> "1½", 0.375 -> "⅜"; rounded to the nearest eighth, or a whole number above 10. """
+    if value != value:
+        return ""
+    if value >= 10:
+        return str(int(round(value)))
+    eighths = max(1, int(round(value * 8)))
+    whole, part = divmod(eighths, 8)
+    return (str(whole) if whole else "") + _EIGHTHS.get(part, "")
+
+
+##### Shopping lists #####
+class IngredientTable:
+    """
+    Every ingredient line of a set of recipes, parsed once into parallel
+    NumPy arrays (recipe row, amount in base units, measure, name), so a
+    whole meal plan is scaled and merged with a few array operations.
+    """
+
+    def __init__(self, recipes, ids=None):
+        from facets import parse_servings
+
+        self.ids = list(ids) if ids is not None else list(range(len(recipes)))
+        self.rows = {rid: i for i, rid in enumerate(self.ids)}
+        servings = [parse_servings(r.get("servings")) for r in recipes]
+        self.servings = np.array([(low + high) / 2 for low, high in servings], dtype=np.float64)
+
+        rows, amounts, measures, names = [], [], [], []
+        for i, recipe in enumerate(recipes):
+            for line in recipe.get("ingredients", []):
+                quantity, unit, name = parse_ingredient(str(line))
+                if not name:
+                    continue
+                rows.append(i)
+                amounts.append(np.nan if quantity is None else quantity * VOLUME.get(unit, WEIGHT.get(unit, 1.0)))
+                measures.append(measure_of(unit))
+                names.append(name)
+        self.recipe = np.asarray(rows, dtype=np.int64)
+        self.amount = np.asarray(amounts, dtype=np.float64)
+        self.measure = np.asarray(measures, dtype=object)
+        self.name = np.asarray(names, dtype=object)
+
+    def scale_factors(self, plan):
+        """ Multiplier per recipe row for [(id, servings), ...]; a recipe planned twice is cooked twice. """
+        factors = np.zeros(len(self.ids), dtype=np.float64)
+        for rid, servings in plan:
+            row = self.rows[rid]
+            base = self.servings[row]
+            # Without a target or a parsable yield the recipe is made as written
+            factors[row] += servings / base if servings and base > 0 else 1.0
+        return factors
+
+    def shopping_list(self, plan):
+        """
+        One merged list for a meal plan of [(id, servings), ...], as a
+        DataFrame of ingredient, quantity, unit and the number of recipes
+        that use it. Amounts of the same ingredient are summed across
+        recipes after converting to a common unit; lines without an amount
+        ("salt, to taste") are listed with a NaN quantity.
+        """
+        scale = self.scale_factors(plan)[self.recipe]
+        used = scale > 0
+        frame = pd.DataFrame({
+            "name": self.name[used],
+            "measure": self.measure[used],
+            "amount": self.amount[used] * scale[used],
+            "recipe": self.recipe[used],
+        })
+        totals = frame.groupby(["name", "measure"], sort=True).agg(
+            amount=("amount", "sum"), known=("amount", "count"), recipes=("recipe", "nunique"),
+        ).reset_index()
+        amount = np.where(totals["known"] > 0, totals["amount"], np.nan)
+
+        # Report each total in the largest unit that keeps it readable
+        measure = totals["measure"].to_numpy()
+        volume, weight = measure == "volume", measure == "weight"
+        unit = np.select(
+            [volume & (amount >= VOLUME["cup"] / 4), volume & (amount >= VOLUME["tbsp"]), volume,
+             weight & (amount >= WEIGHT["lb"]), weight],
+            ["cup", "tbsp", "tsp", "lb", "oz"],
+            default=measure,
+        )
+        size = np.array([VOLUME.get(u, WEIGHT.get(u, 1.0)) for u in unit], dtype=np.float64)
+        return pd.DataFrame({
+            "ingredient": totals["name"],
+            "quantity": amount / size,
+            "unit": unit,
+            "recipes": totals["recipes"],
+        })
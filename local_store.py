@@ -0,0 +1,453 @@
+"""
+Local-first copy of the cookbook's files in GitHub.
+
+Reads are served from memory / an on-disk cache, so the app can render
+immediately even when GitHub is slow or unreachable. The cache is seeded
+from the files bundled with the app and from every successful fetch.
+
+A background thread keeps it in sync:
+  - queued writes (the outbox) are pushed to GitHub, and kept on disk
+    until a push succeeds, so edits made while offline are not lost
+  - watched files (every file read or written in the last `watch_ttl`
+    seconds) are re-checked with conditional GETs, which cost nothing
+    against GitHub's rate limit while a file is unchanged, and newer
+    versions applied; `version` is bumped so the app knows to rerun
+  - watched directories (e.g. the split layout's recipe bodies) are listed
+    with one conditional request, and only cached files whose sha changed
+    are fetched again
+  - a queued write is only pushed as is if the file on GitHub is still
+    the version it was made against. Otherwise the edits it recorded
+    (e.g. "add this recipe") are replayed onto GitHub's version and that
+    is pushed; a write without edits is dropped instead of overwriting,
+    and reported in `conflicts` either way
+
+Files that have to come from GitHub are fetched concurrently, so a cold
+start or a sync costs one round trip rather than one per file.
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+import requests
+
+from github_api import NOT_MODIFIED, git_sha
+
+# Conflicts kept for the app to report; older ones are forgotten
+MAX_CONFLICTS = 100
+# Files fetched per sync for reads that did not wait (read_many(wait=False))
+FILL_BATCH = 200
+
+
+class LocalStore:
+    def __init__(self, remote, cache_dir, seeds=None, interval=30.0, read_only=False, replay=None, watch_ttl=600.0):
+        """
+        remote:    GitHubRepo the files live in
+        cache_dir: directory for cached files and the outbox
+        seeds:     {repo path: local file} used when nothing is cached yet
+        interval:  seconds between background syncs
+        read_only: never write to GitHub; an outbox left in cache_dir is ignored
+        replay:    function(path, content or None, edits) -> new content or None,
+                   redoes a write's edits on a newer version of the file
+        watch_ttl: seconds a file stays watched after it was last read
+        """
+        self.remote = remote
+        self.cache_dir = cache_dir
+        self.interval = interval
+        self.read_only = read_only
+        self.replay = replay
+        self.watch_ttl = watch_ttl
+        self.version = 0            # bumped whenever a remote change is applied
+        self.last_sync = None       # time of the last sync that reached GitHub
+        self.last_error = None      # message from the last failed GitHub call
+        self.conflicts = []         # recent writes made against an older version: {"path", "message", "owners", "time", "saved"}
+
+        self._lock = threading.RLock()
+        self._files = {}            # path -> (content, sha)
+        self._etags = {}            # path -> GitHub's ETag for the cached content, for conditional GETs
+        self._outbox = {}           # path -> {"content": bytes, "message": str, "base": sha written against, "edits": list or None}
+        self._watched = {}          # path -> time it was last read or written
+        self._dirs = set()          # directories whose cached files are re-checked by listing them
+        self._wanted = set()        # files to fetch in the background (read with wait=False)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        os.makedirs(os.path.join(cache_dir, "files"), exist_ok=True)
+        os.makedirs(os.path.join(cache_dir, "outbox"), exist_ok=True)
+        self._load_disk()
+        for path, seed in (seeds or {}).items():
+            if path not in self._files and os.path.exists(seed):
+                with open(seed, "rb") as f:
+                    content = f.read()
+                self._files[path] = (content, git_sha(content))
+
+    ##### Disk cache #####
+    def _disk_path(self, kind, path):
+        return os.path.join(self.cache_dir, kind, quote(path, safe=""))
+
+    def _write_disk(self, kind, path, content):
+        target = self._disk_path(kind, path)
+        tmp = target + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(content)
+        os.replace(tmp, target)
+
+    def _save_meta(self):
+        meta = {
+            "shas": {path: sha for path, (_, sha) in self._files.items()},
+            "etags": self._etags,
+            "outbox": {
+                path: {key: entry[key] for key in ("message", "base", "edits", "owners") if key in entry}
+                for path, entry in self._outbox.items()
+            },
+        }
+        self._write_disk("", "meta.json", json.dumps(meta).encode("utf-8"))
+
+    def _load_disk(self):
+        meta_path = self._disk_path("", "meta.json")
+        if not os.path.exists(meta_path):
+            return
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        for path, sha in meta.get("shas", {}).items():
+            try:
+                with open(self._disk_path("files", path), "rb") as f:
+                    self._files[path] = (f.read(), sha)
+            except OSError:
+                continue
+            if path in meta.get("etags", {}):
+                self._etags[path] = meta["etags"][path]
+        for path, queued in ({} if self.read_only else meta.get("outbox", {})).items():
+            # Older caches only kept the message; those writes are pushed without a version check
+            entry = queued if isinstance(queued, dict) else {"message": queued}
+            try:
+                with open(self._disk_path("outbox", path), "rb") as f:
+                    self._outbox[path] = dict(entry, content=f.read())
+            except OSError:
+                pass
+            self._watched[path] = time.time()
+
+    def _store(self, path, content, sha, etag=None):
+        self._store_many([(path, content, sha, etag)])
+
+    def _store_many(self, found):
+        """ Cache several (path, content, sha, etag) at once, writing meta.json once. """
+        with self._lock:
+            for path, content, sha, etag in found:
+                self._files[path] = (content, sha)
+                if etag:
+                    self._etags[path] = etag
+                else:
+                    # Content we wrote ourselves: GitHub's ETag for it is only known after the next GET
+                    self._etags.pop(path, None)
+                self._write_disk("files", path, content)
+            self._save_meta()
+
+    ##### Reads and writes #####
+    def _watch(self, path):
+        with self._lock:
+            if path not in self._watched:
+                # Check the newly watched file against GitHub straight away
+                self._wake.set()
+            self._watched[path] = time.time()
+
+    def watch_dir(self, directory):
+        """ Keep every cached file in `directory` up to date, checked with one listing per sync. """
+        with self._lock:
+            if directory.strip("/") not in self._dirs:
+                self._dirs.add(directory.strip("/"))
+                self._wake.set()
+        return self
+
+    def _cached(self, path):
+        with self._lock:
+            if path in self._outbox:
+                return self._outbox[path]["content"]
+            if path in self._files:
+                return self._files[path][0]
+        return None
+
+    def _fetch(self, path):
+        try:
+            found = self.remote.get_if_changed(path)
+        except requests.RequestException as e:
+            self.last_error = str(e)
+            return None
+        if found is None:
+            return None
+        self._store(path, *found)
+        return found[0]
+
+    def _check(self, path):
+        """ GitHub's (content, sha, etag) for a file, or None; the cached copy if GitHub says it has not changed. """
+        with self._lock:
+            local = self._files.get(path)
+            etag = self._etags.get(path) if local else None
+        found = self.remote.get_if_changed(path, etag)
+        return (*local, etag) if found is NOT_MODIFIED else found
+
+    def read(self, path, watch=True):
+        """
+        Return the cached content of a file, or None if it does not exist.
+
+        Only fetches from GitHub (blocking) when nothing is cached yet.
+        Watched files are re-checked by the background sync.
+        """
+        return self.read_many([path], watch)[path]
+
+    def read_many(self, paths, watch=True, wait=True):
+        """
+        read() several files at once: {path: content or None}. Files not cached yet are fetched
+        concurrently, or with wait=False left to the background sync (None until then).
+        """
+        found = {}
+        for path in paths:
+            if watch:
+                self._watch(path)
+            found[path] = self._cached(path)
+        missing = [path for path, content in found.items() if content is None]
+        if missing and not wait:
+            with self._lock:
+                new = set(missing) - self._wanted
+                self._wanted.update(new)
+            if new:
+                self._wake.set()
+        elif len(missing) == 1:
+            found[missing[0]] = self._fetch(missing[0])
+        elif missing:
+            with ThreadPoolExecutor(min(len(missing), 8)) as pool:
+                found.update(zip(missing, pool.map(self._fetch, missing)))
+        return found
+
+    def write(self, path, content, message, edits=None, owner=None):
+        """
+        Queue a new version of a file; it is visible to reads at once and
+        pushed in the background. `edits` describes the change for the
+        replay function, so it can be redone if the file changed on GitHub.
+        `owner` (e.g. a session id) is copied to any conflict the write runs into.
+        """
+        if self.read_only:
+            raise PermissionError(f"{path}: store is read-only")
+        with self._lock:
+            # A write is made against the version this process last saw (the first one, while writes queue up)
+            queued = self._outbox.get(path)
+            if queued is not None:
+                base = queued.get("base")
+                # Writes queued on top of each other are replayed together, or not at all
+                if queued.get("edits") is None or edits is None:
+                    edits = None
+                else:
+                    edits = queued["edits"] + list(edits)
+                message = f"{queued['message']}; {message}"
+                owners = sorted(set(queued.get("owners", [])) | ({owner} if owner else set()))
+            else:
+                base = self._files[path][1] if path in self._files else None
+                edits = None if edits is None else list(edits)
+                owners = [owner] if owner else []
+            self._outbox[path] = {"content": content, "message": message, "base": base, "edits": edits, "owners": owners}
+            self._watched[path] = time.time()
+            self._write_disk("outbox", path, content)
+            self._save_meta()
+        self._wake.set()
+
+    @property
+    def pending(self):
+        """ Number of files with writes not yet pushed to GitHub. """
+        with self._lock:
+            return len(self._outbox)
+
+    ##### Sync #####
+    def _dequeue(self, path, entry):
+        """ Drop a pushed (or rejected) write, unless a newer one was queued while it was in flight. """
+        with self._lock:
+            if self._outbox.get(path) is not entry:
+                return False
+            del self._outbox[path]
+            try:
+                os.remove(self._disk_path("outbox", path))
+            except OSError:
+                pass
+            return True
+
+    def _conflict(self, path, entry, saved):
+        with self._lock:
+            self.conflicts.append({
+                "path": path, "message": entry["message"], "owners": entry.get("owners", []), "time": time.time(), "saved": saved,
+            })
+            del self.conflicts[:-MAX_CONFLICTS]
+
+    def _replay(self, path, content, edits):
+        """ `edits` redone on another version of a file, or None if they cannot be. """
+        if self.replay is None or edits is None:
+            return None
+        try:
+            return self.replay(path, content, edits)
+        except ValueError:
+            return None
+
+    def _push(self):
+        with self._lock:
+            queued = list(self._outbox.items())
+        for path, entry in queued:
+            current = self._check(path)
+            remote_sha = current[1] if current else None
+            content = entry["content"]
+            replayed = "base" in entry and remote_sha != entry["base"]
+            if replayed:
+                # Changed on GitHub since this write was made: redo its edits on that version
+                content = self._replay(path, current[0] if current else None, entry.get("edits"))
+                if content is None:
+                    # Nothing to redo it with, so GitHub's version is kept rather than overwritten
+                    self._conflict(path, entry, saved=False)
+                    if self._dequeue(path, entry):
+                        if current is not None:
+                            self._store(path, *current)
+                        else:
+                            self._save_meta()
+                        self.version += 1
+                    continue
+            # The PUT carries the sha, so a change landing in between is rejected by GitHub and retried next sync
+            sha = self.remote.put(path, content, entry["message"], remote_sha)
+            if not self._dequeue(path, entry):
+                self._requeue(path, entry, content, sha, replayed)
+            self._store(path, content, sha)
+            if replayed:
+                self._conflict(path, entry, saved=True)
+                self.version += 1
+
+    def _requeue(self, path, entry, pushed, sha, replayed):
+        """ A later write was queued while `entry` was pushed: it now applies on top of what was pushed. """
+        with self._lock:
+            later = self._outbox.get(path)
+            if later is None:
+                return
+            done = len(entry.get("edits") or [])
+            edits = later["edits"][done:] if later.get("edits") is not None else None
+            if replayed:
+                # The later content was built on the old version too, so it is rebuilt from what was pushed
+                content = self._replay(path, pushed, edits)
+                if content is None:
+                    # Left against the old base: the next push reports it instead of undoing the replay
+                    return
+                later["content"] = content
+                self._write_disk("outbox", path, content)
+            later.update(base=sha, edits=edits, message=later["message"].removeprefix(f"{entry['message']}; "))
+            self._save_meta()
+
+    def _pull(self):
+        with self._lock:
+            # Files nobody has read for a while are no longer checked (queued writes always are)
+            stale = time.time() - self.watch_ttl
+            for path in [p for p, seen in self._watched.items() if seen < stale and p not in self._outbox]:
+                del self._watched[path]
+            watched = [p for p in self._watched if p not in self._outbox]
+        if len(watched) > 1:
+            with ThreadPoolExecutor(min(len(watched), 8)) as pool:
+                remote = list(pool.map(self._check, watched))
+        else:
+            remote = [self._check(p) for p in watched]
+        changed = False
+        for path, found in zip(watched, remote):
+            with self._lock:
+                local = self._files.get(path)
+                if found is None or path in self._outbox:
+                    continue
+                if local and local[1] == found[1]:
+                    if found[2]:
+                        self._etags[path] = found[2]
+                    continue
+            self._store(path, *found)
+            changed = True
+        changed = self._pull_dirs() or changed
+        changed = self._fill() or changed
+        if changed:
+            self.version += 1
+        return changed
+
+    def _pull_dirs(self):
+        """ Re-fetch the cached files of watched directories whose sha in the directory listing changed. """
+        stale, etags = [], {}
+        for directory in sorted(self._dirs):
+            key = f"{directory}/"
+            with self._lock:
+                etag = self._etags.get(key)
+            listing = self.remote.list_dir(directory, etag)
+            if listing is None or listing is NOT_MODIFIED:
+                continue
+            shas, etag = listing
+            with self._lock:
+                stale += [
+                    path for path, sha in shas.items()
+                    if path in self._files and path not in self._outbox and self._files[path][1] != sha
+                ]
+            etags[key] = etag
+        if len(stale) > 1:
+            with ThreadPoolExecutor(min(len(stale), 8)) as pool:
+                found = list(pool.map(self.remote.get_if_changed, stale))
+        else:
+            found = [self.remote.get_if_changed(p) for p in stale]
+        changed = False
+        for path, current in zip(stale, found):
+            with self._lock:
+                if current is None or current is NOT_MODIFIED or path in self._outbox:
+                    continue
+            self._store(path, *current)
+            changed = True
+        # Only now, so a failed fetch is retried rather than hidden behind a 304 for the listing
+        with self._lock:
+            self._etags.update((key, etag) for key, etag in etags.items() if etag)
+        return changed
+
+    def _fill(self):
+        """ Fetch a batch of the files wanted in the background; the next sync follows at once while more are left. """
+        with self._lock:
+            batch = sorted(self._wanted)[:FILL_BATCH]
+        if not batch:
+            return False
+        with ThreadPoolExecutor(min(len(batch), 8)) as pool:
+            found = list(pool.map(self.remote.get_if_changed, batch))
+        with self._lock:
+            self._wanted.difference_update(batch)
+            # A file missing on GitHub is dropped too; reading it again asks for it again
+            fresh = [(path, *current) for path, current in zip(batch, found) if current is not None and path not in self._files]
+            if self._wanted:
+                self._wake.set()
+        if fresh:
+            self._store_many(fresh)
+        return bool(fresh)
+
+    def sync(self):
+        """ Push queued writes, then pull newer versions of watched files. Returns True if anything changed. """
+        try:
+            if not self.read_only:
+                self._push()
+            changed = self._pull()
+        except requests.RequestException as e:
+            self.last_error = str(e)
+            return False
+        self.last_error = None
+        self.last_sync = time.time()
+        return changed
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.sync()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def start(self):
+        """ Start the background sync thread (once). """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="recipe-sync", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,175 @@
+"""
+Split storage for the recipe corpus: a small summary manifest plus one
+body record per recipe.
+
+The list, search, tag and filter views only need each recipe's title,
+tags, ready time, yield and oven temperature, so they read `index.json`;
+the full recipe (ingredients, instructions, notes, ratings) lives in
+`<id>.json` and is fetched when a recipe is opened (the dashboard's
+rating chart reads the bodies in the background).
+
+Saves also record the edits they made ("add this recipe", "rate that
+one"), so a save made against an older version of a file can be replayed
+onto the newer one instead of overwriting it (see LocalStore).
+
+Convert with:
+    python recipe_store.py split recipes.json recipes/
+    python recipe_store.py join recipes/ recipes.json
+"""
+import hashlib
+import json
+import os
+import re
+import sys
+
+import snapshot
+
+MANIFEST_FILE = "index.json"
+
+# Fields copied from a recipe into its manifest entry (the sidebar filters need servings and
+# temperature). Ratings stay in the body, so rating a recipe only rewrites its own file
+SUMMARY_FIELDS = ("title", "tags", "ready_in", "servings", "temperature")
+
+
+def recipe_id(recipe):
+    """ Stable id for a recipe: title slug plus a short hash of title and ingredients. """
+    title = recipe.get("title", "Untitled").lstrip("\ufeff")
+    slug = re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-") or "recipe"
+    key = title + "\n" + "\n".join(str(i) for i in recipe.get("ingredients", []))
+    return f"{slug}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:6]}"
+
+
+def summarize(recipe):
+    """ Manifest entry for a recipe. `search` keeps ingredient search working without the body. """
+    entry = {"id": recipe.get("id") or recipe_id(recipe)}
+    for field in SUMMARY_FIELDS:
+        if field in recipe:
+            entry[field] = recipe[field]
+    entry["search"] = "\n".join(str(i) for i in recipe.get("ingredients", [])).lower()
+    return entry
+
+
+def body_path(rid, root=""):
+    return f"{root.rstrip('/')}/{rid}.json" if root else f"{rid}.json"
+
+
+def unique_id(recipe, taken):
+    """ The recipe's id (or recipe_id()), with a -2, -3... suffix if it is already in `taken`. """
+    rid = base = recipe.get("id") or recipe_id(recipe)
+    n = 2
+    while rid in taken:
+        rid = f"{base}-{n}"
+        n += 1
+    return rid
+
+
+def assign_ids(recipes):
+    """ Ids for a list of recipes, in order. Identical recipes share a recipe_id(), so later copies get a suffix. """
+    ids, seen = [], set()
+    for r in recipes:
+        rid = unique_id(r, seen)
+        seen.add(rid)
+        ids.append(rid)
+    return ids
+
+
+def split(recipes):
+    """ Split a recipe list into (manifest, {id: body}). Bodies carry their id. """
+    manifest, bodies = [], {}
+    for r, rid in zip(recipes, assign_ids(recipes)):
+        body = dict(r)
+        body["id"] = rid
+        bodies[rid] = body
+        manifest.append(summarize(body))
+    return manifest, bodies
+
+
+def join(manifest, bodies):
+    """ Inverse of split(): full recipes in manifest order, without the id field. """
+    recipes = []
+    for entry in manifest:
+        body = dict(bodies[entry["id"]])
+        body.pop("id", None)
+        recipes.append(body)
+    return recipes
+
+
+##### Edits #####
+# {"add": recipe}                  append a recipe (or manifest entry) to a list
+# {"remove": title}                drop every recipe with that title from a list
+# {"rate": title, "rating": n}     add a rating to the first recipe with that title, or to a body file
+def apply_edits(data, edits):
+    """ Apply recorded edits to a decoded file: a list of recipes or summaries, or one recipe body. """
+    for edit in edits:
+        if "add" in edit:
+            data.append(edit["add"])
+        elif "remove" in edit:
+            data[:] = [r for r in data if r.get("title") != edit["remove"]]
+        elif "rate" in edit:
+            recipe = data if isinstance(data, dict) else next((r for r in data if r.get("title") == edit["rate"]), None)
+            # A recipe deleted in the meantime keeps no ratings
+            if recipe is not None:
+                recipe["ratings"] = list(recipe.get("ratings") or []) + [edit["rating"]]
+        else:
+            raise ValueError(f"unknown edit {edit!r}")
+    return data
+
+
+def encode(path, data, base=None):
+    """ Bytes stored at `path`: a snapshot for .snap files, compact JSON for a manifest, indented JSON otherwise. """
+    if path.endswith(snapshot.SUFFIX):
+        return snapshot.dumps(data, base=base)
+    if os.path.basename(path) == MANIFEST_FILE:
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
+def replay(path, content, edits):
+    """ Redo `edits` on another version of a file (None if it does not exist); returns the new bytes, or None. """
+    if path.endswith(snapshot.SUFFIX):
+        base = snapshot.SnapshotReader(content) if content is not None else None
+        data = list(base) if base is not None else []
+    else:
+        base, data = None, json.loads(content.decode("utf-8")) if content is not None else None
+    if data is None:
+        # A body only exists once written; lists (recipes, manifest, recycle bin) start out empty
+        if any("rate" in edit for edit in edits):
+            return None
+        data = []
+    return encode(path, apply_edits(data, edits), base)
+
+
+##### Local directory layout #####
+def write_split(recipes, directory):
+    manifest, bodies = split(recipes)
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, separators=(",", ":"))
+    for rid, body in bodies.items():
+        with open(os.path.join(directory, body_path(rid)), "w", encoding="utf-8") as f:
+            json.dump(body, f, indent=2)
+    return manifest
+
+
+def read_split(directory):
+    with open(os.path.join(directory, MANIFEST_FILE), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    bodies = {}
+    for entry in manifest:
+        with open(os.path.join(directory, body_path(entry["id"])), "r", encoding="utf-8") as f:
+            bodies[entry["id"]] = json.load(f)
+    return join(manifest, bodies)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] not in ("split", "join"):
+        sys.exit("usage: python recipe_store.py {split SRC.json DIR | join DIR DST.json}")
+    if sys.argv[1] == "split":
+        with open(sys.argv[2], "r", encoding="utf-8") as f:
+            n = len(write_split(json.load(f), sys.argv[3]))
+    else:
+        recipes = read_split(sys.argv[2])
+        with open(sys.argv[3], "w", encoding="utf-8") as f:
+            json.dump(recipes, f, indent=2)
+        n = len(recipes)
+    print(f"Converted {n} recipes: {sys.argv[2]} -> {sys.argv[3]}")
@@ -0,0 +1,261 @@
+"""
+"You might also like" recommendations from precomputed TF-IDF neighbours.
+
+Each recipe becomes a TF-IDF vector over the words in its title, tags,
+ingredients and instructions. Words are hashed into a fixed number of
+signed buckets (the hashing trick), so the vocabulary never has to be
+rebuilt and vectors for new recipes can be computed on their own. Vectors
+are L2-normalised rows of a float32 NumPy matrix, so cosine similarity is
+a matrix product.
+
+The top-k neighbours of every recipe are computed up front and kept in
+arrays; looking them up is O(k). Adding or removing a recipe only updates
+the neighbour lists it affects. Existing vectors keep the IDF weights of
+the last full build, though, so the index counts the recipes added or
+removed since then (saved with it) and rebuilds from scratch once they
+add up to more than a twentieth of the corpus.
+"""
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+
+# How much each field counts towards similarity. "search" is the ingredient
+# text kept in the split layout's manifest (see recipe_store.py).
+FIELD_WEIGHTS = {
+    "title": 1.0,
+    "tags": 2.0,
+    "ingredients": 1.0,
+    "search": 1.0,
+    "instructions": 0.5,
+}
+
+STOP_WORDS = {
+    "and", "the", "for", "with", "into", "until", "about", "then", "from", "over",
+    "each", "add", "cup", "cups", "tbsp", "tsp", "tablespoon", "tablespoons",
+    "teaspoon", "teaspoons", "ounce", "ounces", "pound", "pounds", "large",
+    "small", "medium", "minutes", "minute", "chopped", "minced", "taste", "plus",
+}
+
+
+def tokenize(text):
+    return [w for w in re.findall(r"[a-z]+", text.lower()) if len(w) > 2 and w not in STOP_WORDS]
+
+
+class SimilarityIndex:
+    def __init__(self, k=5, dim=512):
+        self.k = k
+        self.dim = dim
+        self.ids = []                # row -> recipe id
+        self.rows = {}               # recipe id -> row
+        self.df = np.zeros(dim, dtype=np.float64)
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+        self.nbr = np.full((0, k), -1, dtype=np.int64)
+        self.nbr_score = np.full((0, k), -np.inf, dtype=np.float32)
+        self.drift = 0               # recipes added/removed since the last full build
+        self.lock = threading.Lock()
+        self._buckets = {}           # token -> (bucket, sign)
+
+    def __len__(self):
+        return len(self.ids)
+
+    ##### Vectors #####
+    def _bucket(self, token):
+        if token not in self._buckets:
+            h = zlib.crc32(token.encode("utf-8"))
+            self._buckets[token] = (h % self.dim, 1.0 if h & 0x80000000 else -1.0)
+        return self._buckets[token]
+
+    def term_frequencies(self, recipe):
+        """ Weighted, sublinear term frequencies of a recipe, hashed into `dim` buckets. """
+        counts = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            value = recipe.get(field)
+            if not value:
+                continue
+            text = " ".join(str(v) for v in value) if isinstance(value, list) else str(value)
+            for token in tokenize(text):
+                counts[token] = counts.get(token, 0.0) + weight
+        tf = np.zeros(self.dim, dtype=np.float32)
+        for token, count in counts.items():
+            bucket, sign = self._bucket(token)
+            tf[bucket] += sign * (1.0 + np.log(count))
+        return tf
+
+    def _idf(self):
+        n = len(self.ids)
+        return np.log((1.0 + n) / (1.0 + self.df)).astype(np.float32) + 1.0
+
+    @staticmethod
+    def _normalize(m):
+        norms = np.linalg.norm(m, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return m / norms
+
+    ##### Neighbours #####
+    def _grow(self, n):
+        """ Make room for n rows, doubling capacity so repeated adds stay cheap. """
+        if n <= len(self.vectors):
+            return
+        cap = max(n, 2 * len(self.vectors), 16)
+        vectors = np.zeros((cap, self.dim), dtype=np.float32)
+        vectors[:len(self.ids)] = self.vectors[:len(self.ids)]
+        nbr = np.full((cap, self.k), -1, dtype=np.int64)
+        nbr[:len(self.ids)] = self.nbr[:len(self.ids)]
+        nbr_score = np.full((cap, self.k), -np.inf, dtype=np.float32)
+        nbr_score[:len(self.ids)] = self.nbr_score[:len(self.ids)]
+        self.vectors, self.nbr, self.nbr_score = vectors, nbr, nbr_score
+
+    def _topk(self, rows, block=1024):
+        """ Recompute the neighbour lists of the given rows against the whole index. """
+        n = len(self.ids)
+        k = min(self.k, n - 1)
+        matrix = self.vectors[:n]
+        for start in range(0, len(rows), block):
+            chunk = np.asarray(rows[start:start + block])
+            scores = matrix[chunk] @ matrix.T
+            scores[np.arange(len(chunk)), chunk] = -np.inf
+            self.nbr[chunk] = -1
+            self.nbr_score[chunk] = -np.inf
+            if k <= 0:
+                continue
+            top = np.argpartition(scores, -k, axis=1)[:, -k:]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            self.nbr[chunk, :k] = np.take_along_axis(top, order, axis=1)
+            self.nbr_score[chunk, :k] = np.take_along_axis(top_scores, order, axis=1)
+
+    ##### Building and updating #####
+    def build(self, ids, recipes):
+        """ Index a whole corpus from scratch. """
+        tf = np.stack([self.term_frequencies(r) for r in recipes]) if recipes else np.zeros((0, self.dim), np.float32)
+        self.ids = []
+        self.vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self.nbr = np.full((0, self.k), -1, dtype=np.int64)
+        self.nbr_score = np.full((0, self.k), -np.inf, dtype=np.float32)
+        self._grow(len(tf))
+        self.ids = list(ids)
+        self.rows = {rid: i for i, rid in enumerate(self.ids)}
+        self.df = (tf != 0).sum(axis=0).astype(np.float64)
+        self.vectors[:len(self.ids)] = self._normalize(tf * self._idf())
+        self._topk(np.arange(len(self.ids)))
+        self.drift = 0
+
+    def add(self, rid, recipe):
+        """ Add one recipe and splice it into the neighbour lists it beats. """
+        tf = self.term_frequencies(recipe)
+        self.df += tf != 0
+        row = len(self.ids)
+        self._grow(row + 1)
+        self.ids.append(rid)
+        self.rows[rid] = row
+        self.vectors[row] = self._normalize(tf * self._idf())
+
+        # The new recipe's own neighbours
+        self._topk([row])
+
+        # Existing recipes whose weakest neighbour scores below the new one
+        scores = self.vectors[:row] @ self.vectors[row]
+        beaten = np.nonzero(scores > self.nbr_score[:row, -1])[0]
+        if len(beaten):
+            cand = np.hstack([self.nbr[beaten], np.full((len(beaten), 1), row)])
+            cand_score = np.hstack([self.nbr_score[beaten], scores[beaten, None]])
+            order = np.argsort(-cand_score, axis=1)[:, :self.k]
+            self.nbr[beaten] = np.take_along_axis(cand, order, axis=1)
+            self.nbr_score[beaten] = np.take_along_axis(cand_score, order, axis=1)
+
+    def remove(self, rid):
+        """ Drop one recipe; only the lists that pointed at it are recomputed. """
+        row = self.rows.pop(rid)
+        last = len(self.ids) - 1
+        n = last
+        self.df -= self.vectors[row] != 0
+        affected = np.nonzero((self.nbr[:last + 1] == row).any(axis=1))[0]
+
+        # Move the last row into the hole so rows stay contiguous
+        if row != last:
+            self.vectors[row] = self.vectors[last]
+            self.nbr[row] = self.nbr[last]
+            self.nbr_score[row] = self.nbr_score[last]
+            self.ids[row] = self.ids[last]
+            self.rows[self.ids[row]] = row
+            self.nbr[:n][self.nbr[:n] == last] = row
+            affected = np.where(affected == last, row, affected)
+        self.ids.pop()
+        self.vectors[last] = 0
+        self.nbr[last] = -1
+        self.nbr_score[last] = -np.inf
+        affected = affected[affected < n]
+        if len(affected):
+            self._topk(affected)
+
+    def sync(self, recipes_by_id):
+        """
+        Bring the index in line with {id: recipe}: add new ids, remove missing
+        ones. Falls back to a full rebuild when the changes since the last
+        one, this sync's included, pass a twentieth of the corpus.
+        """
+        with self.lock:
+            current = set(self.rows)
+            new = [rid for rid in recipes_by_id if rid not in current]
+            gone = [rid for rid in current if rid not in recipes_by_id]
+            if not new and not gone:
+                return
+            if not self.ids or self.drift + len(new) + len(gone) > len(self.ids) // 20:
+                self.build(list(recipes_by_id), list(recipes_by_id.values()))
+                return
+            for rid in gone:
+                self.remove(rid)
+            for rid in new:
+                self.add(rid, recipes_by_id[rid])
+            self.drift += len(new) + len(gone)
+
+    ##### Saving #####
+    def save(self, path):
+        """ Write the index to an .npz file, for load() in a later process. """
+        with self.lock:
+            n = len(self.ids)
+            tmp = path + ".tmp"
+            with open(tmp, "wb") as f:
+                np.savez(
+                    f, shape=np.array([self.k, self.dim]), drift=np.array(self.drift), ids=np.asarray(self.ids, dtype=str), df=self.df,
+                    vectors=self.vectors[:n], nbr=self.nbr[:n], nbr_score=self.nbr_score[:n],
+                )
+            os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, k=5, dim=512):
+        """
+        An index written by save(); empty if the file is missing, was built
+        with another k/dim or predates the drift count.
+        """
+        index = cls(k, dim)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if tuple(data["shape"]) != (k, dim):
+                    return index
+                index.ids = [str(rid) for rid in data["ids"]]
+                index.rows = {rid: i for i, rid in enumerate(index.ids)}
+                index.df = data["df"]
+                index.vectors, index.nbr, index.nbr_score = data["vectors"], data["nbr"], data["nbr_score"]
+                index.drift = int(data["drift"])
+        except (OSError, KeyError, ValueError):
+            return cls(k, dim)
+        return index
+
+    ##### Queries #####
+    def similar(self, rid, k=None):
+        """ Precomputed neighbours of a recipe as [(id, score)], best first. """
+        k = self.k if k is None else min(k, self.k)
+        # sync() moves rows around, so read under the same lock
+        with self.lock:
+            row = self.rows.get(rid)
+            if row is None:
+                return []
+            return [
+                (self.ids[j], float(score))
+                for j, score in zip(self.nbr[row, :k], self.nbr_score[row, :k])
+                if j >= 0
+            ]
@@ -0,0 +1,230 @@
+"""
+Compact binary snapshot format for the recipe corpus.
+
+A snapshot holds the same list of recipes as recipes.json, but:
+  - repeated short strings (tags, ready_in, servings, temperature) are
+    stored once in a string table and referenced by index
+  - every recipe is a separate length-prefixed record, zlib-compressed
+    against a shared preset dictionary of the corpus' most common words
+    (units, ingredient names, cooking verbs), so records stay small while
+    remaining individually decodable
+  - an offset index lets a memory-mapped reader decode recipes lazily
+  - re-encoding a corpus against the reader it was loaded from reuses the
+    string table, dictionary and compressed bytes of unchanged recipes,
+    so saving one edit only compresses that recipe
+
+Layout (little-endian):
+    header   "<6sHIII"  magic, version, record count, strtab length, zdict length
+    strtab   zlib-compressed JSON list of strings
+    zdict    preset compression dictionary
+    index    record count x u64, absolute offset of each record
+    records  u32 length + zlib(compact JSON) per recipe
+
+Convert with:
+    python snapshot.py to-snap recipes.json recipes.snap
+    python snapshot.py to-json recipes.snap recipes.json
+"""
+import hashlib
+import json
+import mmap
+import re
+import struct
+import sys
+import zlib
+from collections import Counter
+
+MAGIC = b"CKSNAP"
+VERSION = 1
+SUFFIX = ".snap"
+
+HEADER = struct.Struct("<6sHIII")
+OFFSET = struct.Struct("<Q")
+LENGTH = struct.Struct("<I")
+
+# Fields whose values repeat across recipes and go in the string table
+INTERNED_FIELDS = ("ready_in", "servings", "temperature")
+ZDICT_SIZE = 32 * 1024
+
+
+##### Encoding #####
+def _build_zdict(recipes, size=ZDICT_SIZE):
+    """ Preset dictionary of frequent words; zlib matches best against its end, so most common go last. """
+    words = Counter()
+    for r in recipes:
+        for field in ("ingredients", "instructions"):
+            for line in r.get(field, []) or []:
+                if isinstance(line, str):
+                    words.update(re.findall(r"\w+", line.lower()))
+    common = [w for w, n in words.most_common() if n > 1 and len(w) > 2]
+    zdict, total = [], 0
+    for w in common:
+        if total + len(w) + 1 > size:
+            break
+        zdict.append(w)
+        total += len(w) + 1
+    return " ".join(reversed(zdict)).encode("utf-8")
+
+
+def _intern(value, strings, table):
+    """ Strings become string-table indexes; anything else is wrapped in a list. """
+    if not isinstance(value, str):
+        return [value]
+    if value not in table:
+        table[value] = len(strings)
+        strings.append(value)
+    return table[value]
+
+
+def _unintern(value, strings):
+    return strings[value] if isinstance(value, int) else value[0]
+
+
+def _encode_record(recipe, strings, table):
+    record = {}
+    for key, value in recipe.items():
+        if key in INTERNED_FIELDS:
+            value = _intern(value, strings, table)
+        elif key == "tags" and isinstance(value, list):
+            value = [_intern(t, strings, table) for t in value]
+        record[key] = value
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps(recipes, base=None):
+    """
+    Serialise a list of recipes to snapshot bytes. `base` is an optional
+    SnapshotReader of the version being edited: recipes it has decoded and
+    that are unchanged keep their compressed record as is.
+    """
+    if base is not None:
+        strings, zdict, reuse = list(base.strings), base.zdict, base._records
+    else:
+        strings, zdict, reuse = [], _build_zdict(recipes), {}
+    table = {value: i for i, value in enumerate(strings)}
+    records = []
+    for r in recipes:
+        plain = _encode_record(r, strings, table)
+        record = reuse.get(hashlib.sha1(plain).digest())
+        if record is None:
+            comp = zlib.compressobj(9, zdict=zdict) if zdict else zlib.compressobj(9)
+            data = comp.compress(plain) + comp.flush()
+            record = LENGTH.pack(len(data)) + data
+        records.append(record)
+
+    strtab = zlib.compress(json.dumps(strings, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 9)
+    offset = HEADER.size + len(strtab) + len(zdict) + OFFSET.size * len(records)
+    index = bytearray()
+    for rec in records:
+        index += OFFSET.pack(offset)
+        offset += len(rec)
+
+    header = HEADER.pack(MAGIC, VERSION, len(records), len(strtab), len(zdict))
+    return b"".join([header, strtab, zdict, bytes(index)] + records)
+
+
+##### Decoding #####
+class SnapshotReader:
+    """
+    Read-only, lazily decoded view of a snapshot.
+
+    Wraps any buffer (bytes or an mmap); only the header, string table and
+    index are read up front, and each recipe is decompressed on first access.
+    """
+
+    def __init__(self, buf):
+        self.buf = buf
+        magic, version, count, strtab_len, zdict_len = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a recipe snapshot")
+        if version != VERSION:
+            raise ValueError(f"Unsupported snapshot version {version}")
+        pos = HEADER.size
+        self.strings = json.loads(zlib.decompress(buf[pos:pos + strtab_len]).decode("utf-8"))
+        pos += strtab_len
+        self.zdict = bytes(buf[pos:pos + zdict_len])
+        pos += zdict_len
+        self.count = count
+        self._index = pos
+        self._cache = {}
+        self._records = {}          # sha1 of a decoded record's JSON -> its length-prefixed bytes, for dumps(base=)
+
+    def __len__(self):
+        return self.count
+
+    def _decode(self, i):
+        (start,) = OFFSET.unpack_from(self.buf, self._index + OFFSET.size * i)
+        (length,) = LENGTH.unpack_from(self.buf, start)
+        raw = bytes(self.buf[start:start + LENGTH.size + length])
+        decomp = zlib.decompressobj(zdict=self.zdict) if self.zdict else zlib.decompressobj()
+        plain = decomp.decompress(raw[LENGTH.size:]) + decomp.flush()
+        self._records[hashlib.sha1(plain).digest()] = raw
+        record = json.loads(plain.decode("utf-8"))
+        for key in INTERNED_FIELDS:
+            if key in record:
+                record[key] = _unintern(record[key], self.strings)
+        if isinstance(record.get("tags"), list):
+            record["tags"] = [_unintern(t, self.strings) for t in record["tags"]]
+        return record
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("snapshot index out of range")
+        if i not in self._cache:
+            self._cache[i] = self._decode(i)
+        return self._cache[i]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def close(self):
+        if isinstance(self.buf, mmap.mmap):
+            self.buf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def loads(data):
+    """ Decode snapshot bytes into a plain list of recipes. """
+    reader = SnapshotReader(data)
+    return [reader._decode(i) for i in range(len(reader))]
+
+
+def open_snapshot(path):
+    """ Memory-map a snapshot file and return a lazy SnapshotReader over it. """
+    with open(path, "rb") as f:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return SnapshotReader(buf)
+
+
+##### Converters #####
+def json_to_snapshot(src, dst):
+    with open(src, "r", encoding="utf-8") as f:
+        recipes = json.load(f)
+    with open(dst, "wb") as f:
+        f.write(dumps(recipes))
+    return len(recipes)
+
+
+def snapshot_to_json(src, dst):
+    with open(src, "rb") as f:
+        recipes = loads(f.read())
+    with open(dst, "w", encoding="utf-8") as f:
+        json.dump(recipes, f, indent=2)
+    return len(recipes)
+
+
+if __name__ == "__main__":
+    commands = {"to-snap": json_to_snapshot, "to-json": snapshot_to_json}
+    if len(sys.argv) != 4 or sys.argv[1] not in commands:
+        sys.exit("usage: python snapshot.py {to-snap|to-json} SRC DST")
+    n = commands[sys.argv[1]](sys.argv[2], sys.argv[3])
+    print(f"Converted {n} recipes: {sys.argv[2]} -> {sys.argv[3]}")